@@ -60,6 +60,9 @@ def connect(*args, **kwargs):
     :type verify_ssl: boolean
     :param verify_ssl: Verify SSL certificate
 
+    :type connection: :class:`~syncano.connection.ConnectionPool`
+    :param connection: Ready connection (or pool of connections) used instead of a new one
+
     :rtype: :class:`syncano.models.registry.Registry`
     :return: A models registry
 
@@ -76,6 +79,10 @@ def connect(*args, **kwargs):
         connection = syncano.connect(username='', password='', api_key='', instance_name='')
         # OR
         connection = syncano.connect(user_key='', api_key='', instance_name='')
+
+        # Many API keys
+        pool = ConnectionPool([Connection(api_key=''), Connection(api_key='')])
+        connection = syncano.connect(connection=pool, instance_name='')
     """
     from syncano.connection import DefaultConnection
     from syncano.models import registry
@@ -87,3 +94,27 @@ def connect(*args, **kwargs):
     if instance is not None:
         registry.set_used_instance(instance)
     return registry
+
+
+def deadline(seconds=None, token=None):
+    """
+    Limits the time of all requests sent within the block, also by concurrent operations started in it.
+
+    :type seconds: float
+    :param seconds: Time limit of the block; the timeouts of requests are shrunk to the remaining time
+
+    :type token: :class:`syncano.utils.CancellationToken`
+    :param token: Token which cancels the requests of the block, e.g. from another thread
+
+    Usage::
+
+        with syncano.deadline(2.0):
+            book = Object.please.get(class_name='books', id=1)
+            Object.please.bulk_create(*objects)
+
+    Raises :class:`~syncano.exceptions.SyncanoDeadlineExceeded` or
+    :class:`~syncano.exceptions.SyncanoOperationCancelled`.
+    """
+    from syncano.utils import Deadline
+
+    return Deadline(seconds, token)
@@ -1,19 +1,33 @@
 import json
+import math
+import threading
 import time
+import zlib
+from collections import deque
 from copy import deepcopy
+from itertools import count
 
 import requests
 import six
 import syncano
-from syncano.exceptions import RevisionMismatchException, SyncanoRequestError, SyncanoValueError
+from six.moves import queue
+from syncano.exceptions import (
+    RevisionMismatchException,
+    SyncanoCircuitOpenError,
+    SyncanoDeadlineExceeded,
+    SyncanoOperationCancelled,
+    SyncanoRequestError,
+    SyncanoValueError
+)
+from syncano.utils import DEFAULT_WORKERS, ConcurrencyGovernor, Deadline
 
 if six.PY3:
-    from urllib.parse import urljoin
+    from urllib.parse import urljoin, urlparse
 else:
-    from urlparse import urljoin
+    from urlparse import urljoin, urlparse
 
 
-__all__ = ['Connection', 'ConnectionMixin']
+__all__ = ['CircuitBreaker', 'Connection', 'ConnectionPool', 'ConnectionMixin', 'HedgingPolicy', 'SingleFlight']
 
 
 def is_success(code):
@@ -43,12 +57,174 @@ class DefaultConnection(object):
         return self._connection
 
     def open(self, *args, **kwargs):
-        connection = Connection(*args, **kwargs)
+        connection = kwargs.pop('connection', None) or Connection(*args, **kwargs)
         if not self._connection:
             self._connection = connection
         return connection
 
 
+class HedgingPolicy(object):
+    """Decides when a duplicate of a slow GET request is sent.
+
+    :ivar percentile: Percentile of recent latencies after which the duplicate is sent
+    :ivar budget: Maximum ratio of duplicates to all GET requests
+    :ivar latencies: Latencies (in seconds) of recent GET requests
+
+    Usage::
+
+        connection = Connection(api_key='', hedging=HedgingPolicy(percentile=95, budget=0.05))
+    """
+
+    WINDOW = 200
+    MIN_SAMPLES = 20
+
+    def __init__(self, percentile=95, budget=0.05, window=WINDOW):
+        if not 0 < percentile <= 100:
+            raise SyncanoValueError('"percentile" should be between 0 and 100.')
+
+        self.percentile = percentile
+        self.budget = budget
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+
+    def get_delay(self):
+        """Counts a new request and returns the time after which its duplicate is sent, if there are enough samples."""
+        with self._lock:
+            self.requests += 1
+            if len(self.latencies) < self.MIN_SAMPLES:
+                return None
+            latencies = sorted(self.latencies)
+
+        index = int(math.ceil(len(latencies) * self.percentile / 100.0)) - 1
+        return latencies[max(index, 0)]
+
+    def allow_hedge(self):
+        """Counts a duplicate if it fits into the budget."""
+        with self._lock:
+            if self.hedges + 1 > self.requests * self.budget:
+                return False
+            self.hedges += 1
+            return True
+
+
+class SingleFlight(object):
+    """Runs a function once for concurrent calls with the same key, the other callers wait for its result.
+
+    Usage::
+
+        flights = SingleFlight()
+        content = flights.do(key, lambda: fetch(url))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, function):
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                is_leader = flight is None
+                if is_leader:
+                    flight = self._flights[key] = {'done': threading.Event(), 'waiters': 0}
+                else:
+                    flight['waiters'] += 1
+
+            if is_leader:
+                return self._lead(key, flight, function)
+
+            self._wait(flight)
+            error = flight.get('error')
+            if isinstance(error, (SyncanoDeadlineExceeded, SyncanoOperationCancelled)):
+                continue  # the deadline of the caller which sent the request has passed, not ours;
+            if error is not None:
+                raise error
+            # every caller gets its own copy, the responses are mutated by models;
+            return deepcopy(flight['result'])
+
+    def _lead(self, key, flight, function):
+        try:
+            flight['result'] = function()
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight['done'].set()
+
+        return deepcopy(flight['result']) if flight['waiters'] else flight['result']
+
+    @classmethod
+    def _wait(cls, flight):
+        deadline = Deadline.current()
+        if deadline is None:
+            flight['done'].wait()
+            return
+        while not flight['done'].wait(deadline.get_timeout(Deadline.POLL_INTERVAL)):
+            pass
+
+
+class CircuitBreaker(object):
+    """Fails fast requests to an endpoint after its consecutive failures.
+
+    :ivar threshold: Number of consecutive failures (server errors, timeouts, connection errors) opening the circuit
+    :ivar reset_timeout: Seconds after which a single probe request is let through an open circuit
+
+    Usage::
+
+        connection = Connection(api_key='', circuit_breaker=CircuitBreaker(threshold=5, reset_timeout=30))
+
+    A successful probe closes the circuit and a failed one opens it again; requests to an open circuit
+    raise :class:`~syncano.exceptions.SyncanoCircuitOpenError`, a :class:`~syncano.exceptions.SyncanoRequestError`
+    with status 503.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.circuits = {}
+        self._lock = threading.Lock()
+
+    def get_state(self, endpoint):
+        circuit = self.circuits.get(endpoint)
+        return circuit['state'] if circuit else self.CLOSED
+
+    def before(self, endpoint):
+        """Raises SyncanoCircuitOpenError unless a request to the endpoint can be sent."""
+        with self._lock:
+            circuit = self.circuits.get(endpoint)
+            if circuit is None or circuit['state'] == self.CLOSED:
+                return
+            if circuit['state'] == self.OPEN and time.time() - circuit['opened_at'] >= self.reset_timeout:
+                circuit['state'] = self.HALF_OPEN  # this request is the probe;
+                return
+        raise SyncanoCircuitOpenError(endpoint)
+
+    def after(self, endpoint, success=None):
+        """Records the outcome of a request; success is None when it says nothing about the endpoint."""
+        with self._lock:
+            circuit = self.circuits.setdefault(endpoint, {'state': self.CLOSED, 'failures': 0, 'opened_at': None})
+            if success:
+                circuit.update(state=self.CLOSED, failures=0)
+            elif success is not None:
+                circuit['failures'] += 1
+                if circuit['state'] == self.HALF_OPEN or circuit['failures'] >= self.threshold:
+                    circuit.update(state=self.OPEN, opened_at=time.time())
+            elif circuit['state'] == self.HALF_OPEN:  # let the next request probe the endpoint;
+                circuit.update(state=self.OPEN, opened_at=time.time() - self.reset_timeout)
+
+
 class Connection(object):
     """Base connection class.
 
@@ -61,10 +237,20 @@ class Connection(object):
     :ivar logger: Python logger instance
     :ivar timeout: Default request timeout
     :ivar verify_ssl: Verify SSL certificate
+    :ivar governor: :class:`~syncano.utils.ConcurrencyGovernor` limiting the parallel operations of the connection
+    :ivar hedging: :class:`~syncano.connection.HedgingPolicy` for GET requests, disabled by default
+    :ivar flights: :class:`~syncano.connection.SingleFlight` coalescing identical concurrent GET requests,
+        enabled with ``single_flight=True``; a GET joining a request sent by another thread before its own
+        write can return content from before that write, so it fits read-mostly data, e.g. class schemas
+    :ivar circuit_breaker: :class:`~syncano.connection.CircuitBreaker` of the endpoints, ``None`` disables it
     """
 
     CONTENT_TYPE = 'application/json'
 
+    # Tasks of parallel operations waiting for a free slot of the governor run in the priority order (lower first)
+    PRIORITY_INTERACTIVE = 0
+    PRIORITY_BACKGROUND = 10
+
     AUTH_SUFFIX = 'v1/account/auth'
     ACCOUNT_SUFFIX = 'v1/account/'
     SOCIAL_AUTH_SUFFIX = AUTH_SUFFIX + '/{social_backend}/'
@@ -93,6 +279,10 @@ class Connection(object):
         self.timeout = kwargs.get('timeout', 30)
         # We don't need to check SSL cert in DEBUG mode
         self.verify_ssl = kwargs.pop('verify_ssl', True)
+        self.governor = kwargs.pop('governor', None) or ConcurrencyGovernor()
+        self.hedging = kwargs.pop('hedging', None)
+        self.flights = SingleFlight() if kwargs.pop('single_flight', False) else None
+        self.circuit_breaker = kwargs.pop('circuit_breaker', CircuitBreaker())
 
         self._init_login_params(kwargs)
 
@@ -267,14 +457,12 @@ class Connection(object):
             params['data'] = json.dumps(params['data'])
 
         url = self.build_url(path)
-        response = method(url, **params)
+        if self.flights is not None and method_name.upper() == 'GET' and not files:
+            # identical concurrent GET requests share one HTTP call;
+            key = self.get_flight_key(url, params)
+            return self.flights.do(key, lambda: self.fetch(method_name, method, url, params)[1])
 
-        while response.status_code == 429:  # throttling;
-            retry_after = response.headers.get('retry-after', 1)
-            time.sleep(float(retry_after))
-            response = method(url, **params)
-
-        content = self.get_response_content(url, response)
+        response, content = self.fetch(method_name, method, url, params)
 
         if files:
             # remove 'data' and 'content-type' to avoid "ValueError: Data must not be a string."
@@ -287,11 +475,153 @@ class Connection(object):
 
             patch = getattr(self.session, 'patch')
             # second request is needed to upload a file
-            response = patch(url, **params)
+            response = self.send(patch, url, params)
             content = self.get_response_content(url, response)
 
         return content
 
+    def fetch(self, method_name, method, url, params):
+        """
+        Sends the request, again while it is throttled, and returns the response with its content;
+        server errors, timeouts and connection errors are counted by the circuit breaker of the endpoint.
+        """
+        if self.circuit_breaker is None:
+            return self._fetch(method_name, method, url, params)
+
+        endpoint = self.get_endpoint_template(url)
+        self.circuit_breaker.before(endpoint)
+        success = None
+        try:
+            result = self._fetch(method_name, method, url, params)
+            success = True
+            return result
+        except SyncanoRequestError as e:
+            success = not is_server_error(e.status_code)
+            raise
+        except requests.RequestException:
+            success = False
+            raise
+        finally:
+            self.circuit_breaker.after(endpoint, success)
+
+    @classmethod
+    def get_endpoint_template(cls, url):
+        from syncano.models.registry import registry  # avoid circular import;
+        return registry.get_endpoint_template(urlparse(url).path)
+
+    def _fetch(self, method_name, method, url, params):
+        is_hedged = self.hedging is not None and method_name.upper() == 'GET'
+        send = self.send_hedged if is_hedged else self.send
+        response = send(method, url, params)
+
+        while response.status_code == 429:  # throttling;
+            retry_after = response.headers.get('retry-after', 1)
+            deadline = Deadline.current()
+            if deadline is not None:
+                deadline.sleep(float(retry_after))
+            else:
+                time.sleep(float(retry_after))
+            response = send(method, url, params)
+
+        return response, self.get_response_content(url, response)
+
+    @classmethod
+    def get_flight_key(cls, url, params):
+        """Identifies a request by its URL, query, payload and headers (with the auth keys)."""
+        params = {name: value for name, value in six.iteritems(params) if name != 'timeout'}
+        return url, json.dumps(params, sort_keys=True, default=repr)
+
+    def send(self, method, url, params):
+        """
+        Sends a single HTTP request; within a slot of a governor its outcome is reported to the governor
+        and within a deadline the request timeout is shrunk to the remaining time.
+        """
+        deadline = Deadline.current()
+        if deadline is not None:
+            deadline.check()
+
+        governor = ConcurrencyGovernor.current()
+        started_at = None
+        status_code = None
+        try:
+            if deadline is not None:
+                params = dict(params, timeout=deadline.get_timeout(params.get('timeout')))
+            started_at = time.time()
+            response = method(url, **params)
+            status_code = response.status_code
+            return response
+        except requests.Timeout:
+            if deadline is not None and deadline.is_expired:
+                started_at = None  # the timeout was shrunk by the deadline, it says nothing about the server load;
+                raise SyncanoDeadlineExceeded('Deadline exceeded.')
+            raise
+        finally:
+            if governor is not None and started_at is not None:
+                governor.report(status_code, time.time() - started_at, endpoint=self.get_endpoint_template(url))
+
+    def send_hedged(self, method, url, params):
+        """
+        Sends an idempotent request and, when it takes longer than the percentile of recent latencies,
+        a duplicate of it (within the budget of the hedging policy); returns the first successful response.
+        """
+        send = self.send
+        governor = ConcurrencyGovernor.current()
+        if governor is not None:
+            send = governor.bind(send)
+        deadline = Deadline.current()
+        if deadline is not None:
+            send = deadline.wrap(send)
+
+        results = queue.Queue()
+
+        def attempt():
+            started_at = time.time()
+            try:
+                response = send(method, url, params)
+            except Exception as e:
+                results.put((False, e))
+            else:
+                self.hedging.record(time.time() - started_at)
+                results.put((True, response))
+
+        delay = self.hedging.get_delay()
+        if delay is None:  # not enough samples yet;
+            attempt()
+            return self._get_hedged_result(results, 1)
+
+        self._start_attempt(attempt)
+        attempts = 1
+        try:
+            first = results.get(timeout=delay)
+        except queue.Empty:
+            if self._has_free_slot() and self.hedging.allow_hedge():
+                self._start_attempt(attempt)
+                attempts += 1
+        else:
+            results.put(first)
+        return self._get_hedged_result(results, attempts)
+
+    @classmethod
+    def _get_hedged_result(cls, results, attempts):
+        for attempt in range(attempts):
+            is_success, result = results.get()
+            if is_success:
+                return result
+            if attempt == attempts - 1:
+                raise result
+
+    @classmethod
+    def _start_attempt(cls, attempt):
+        thread = threading.Thread(target=attempt)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def _has_free_slot(cls):
+        # a duplicate sent by a parallel operation should not exceed the limit of its governor;
+        governor = ConcurrencyGovernor.current()
+        return governor is None or governor.in_flight < governor.workers
+
     def get_response_content(self, url, response):
         try:
             content = response.json()
@@ -434,6 +764,106 @@ class Connection(object):
         return files
 
 
+class ConnectionPool(object):
+    """Spreads requests over several connections, e.g. with different API keys or hosts.
+
+    :ivar connections: List of :class:`~syncano.connection.Connection` instances
+    :ivar routing: One of ``round_robin``, ``least_loaded`` or ``hash``
+    :ivar key: Callable which takes a method name and a path and returns the key used by the ``hash`` routing
+
+    Usage::
+
+        pool = ConnectionPool([
+            Connection(api_key='first key'),
+            Connection(api_key='second key'),
+        ], routing=ConnectionPool.LEAST_LOADED)
+
+        syncano.connect(connection=pool, instance_name='test-instance')
+        # OR
+        Object.please.using(pool).list(class_name='books')
+
+    The ``hash`` routing sends requests with the same path (without the query string) through the same
+    connection, so pages of a list are fetched with the same API key. All connections should have
+    access to the same data, the pool does not merge results from different instances.
+    """
+
+    ROUND_ROBIN = 'round_robin'
+    LEAST_LOADED = 'least_loaded'
+    HASH = 'hash'
+    ROUTINGS = (ROUND_ROBIN, LEAST_LOADED, HASH)
+
+    def __init__(self, connections, routing=ROUND_ROBIN, key=None):
+        connections = list(connections)
+        if not connections:
+            raise SyncanoValueError('"connections" should not be empty.')
+
+        if not all(isinstance(connection, Connection) for connection in connections):
+            raise SyncanoValueError('"connections" needs to be a list of Syncano Connection instances.')
+
+        if routing not in self.ROUTINGS:
+            allowed = ', '.join(self.ROUTINGS)
+            raise SyncanoValueError('Invalid routing "{0}" allowed are {1}.'.format(routing, allowed))
+
+        self.connections = connections
+        self.routing = routing
+        self.key = key or (lambda method_name, path: path.split('?', 1)[0])
+        self.in_flight = [0] * len(connections)
+        # parallel operations over the pool get the slots of all its connections;
+        self.governor = ConcurrencyGovernor(initial=DEFAULT_WORKERS * len(connections),
+                                            max_limit=ConcurrencyGovernor.MAX_LIMIT * len(connections))
+        self._counter = count()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # host, session, build_params and the rest are taken from the first connection;
+        if name == 'connections':
+            raise AttributeError(name)
+        return getattr(self.connections[0], name)
+
+    def get_index(self, method_name, path):
+        """Returns the index of the connection which should handle the request."""
+        size = len(self.connections)
+        if self.routing == self.HASH:
+            key = self.key(method_name, path)
+            if isinstance(key, six.text_type):
+                key = key.encode('utf-8')
+            return (zlib.crc32(key) & 0xffffffff) % size
+
+        start = next(self._counter) % size
+        if self.routing == self.ROUND_ROBIN:
+            return start
+
+        # least loaded, ties are resolved in the round robin order;
+        indexes = [(start + offset) % size for offset in range(size)]
+        return min(indexes, key=lambda index: self.in_flight[index])
+
+    def request(self, method_name, path, **kwargs):
+        return self._route('request', method_name, path, **kwargs)
+
+    def make_request(self, method_name, path, **kwargs):
+        return self._route('make_request', method_name, path, **kwargs)
+
+    def is_authenticated(self):
+        return all(connection.is_authenticated() for connection in self.connections)
+
+    def authenticate(self, **kwargs):
+        return [connection.authenticate(**kwargs) for connection in self.connections]
+
+    def _route(self, method, method_name, path, **kwargs):
+        with self._lock:
+            index = self.get_index(method_name, path)
+            self.in_flight[index] += 1
+
+        try:
+            return getattr(self.connections[index], method)(method_name, path, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight[index] -= 1
+
+
+ShardedConnection = ConnectionPool
+
+
 class ConnectionMixin(object):
     """Injects connection attribute with support of basic validation."""
 
@@ -449,8 +879,8 @@ class ConnectionMixin(object):
 
     @connection.setter
     def connection(self, value):
-        if not isinstance(value, Connection):
-            raise SyncanoValueError('"connection" needs to be a Syncano Connection instance.')
+        if not isinstance(value, (Connection, ConnectionPool)):
+            raise SyncanoValueError('"connection" needs to be a Syncano Connection or ConnectionPool instance.')
         self._connection = value
 
     @connection.deleter
@@ -73,9 +73,53 @@ class SyncanoDoesNotExist(SyncanoException):
     """Syncano object doesn't exist error occurred."""
 
 
+class SyncanoDeadlineExceeded(SyncanoException):
+    """The deadline of an operation passed before it was completed."""
+
+
+class SyncanoOperationCancelled(SyncanoException):
+    """The operation was cancelled with a cancellation token."""
+
+
+class SyncanoCircuitOpenError(SyncanoRequestError):
+    """Requests to an endpoint are not sent after its consecutive failures;
+    handled like a 503 response of the endpoint.
+
+    :ivar endpoint: Endpoint path template
+    """
+
+    def __init__(self, endpoint, *args):
+        self.endpoint = endpoint
+        super(SyncanoCircuitOpenError, self).__init__(503, 'Circuit open for "{0}".'.format(endpoint), *args)
+
+
 class RevisionMismatchException(SyncanoRequestError):
     """Revision do not match with expected one"""
 
 
 class UserNotFound(SyncanoRequestError):
     """Special error to handle user not found case."""
+
+
+class UnitOfWorkError(SyncanoRequestError):
+    """Some of the requests queued in a unit of work failed.
+
+    :ivar errors: List of (instance, batch response) tuples
+    """
+
+    def __init__(self, errors, *args):
+        self.errors = errors
+        response = errors[0][1]
+        super(UnitOfWorkError, self).__init__(response.get('code'), response.get('content'), *args)
+
+
+class IncrementBufferError(SyncanoRequestError):
+    """Some of the increments sent by an increment buffer failed.
+
+    :ivar errors: List of (object properties, field deltas, batch response) tuples
+    """
+
+    def __init__(self, errors, *args):
+        self.errors = errors
+        response = errors[0][2]
+        super(IncrementBufferError, self).__init__(response.get('code'), response.get('content'), *args)
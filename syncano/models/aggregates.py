@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+import six
+from syncano.exceptions import SyncanoValueError
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class ObjectAggregate(object):
+    """
+    Helper class for computing aggregates of data objects page by page;
+
+    Usage:
+        results = ObjectAggregate(manager, {'sum': 'price', 'count': True}, group_by='status').process()
+    """
+    FUNCTIONS = ('count', 'sum', 'avg', 'min', 'max')
+    NUMERIC_FUNCTIONS = ('sum', 'avg')
+
+    def __init__(self, manager, aggregates, group_by=None, use_numpy=None):
+        self.manager = manager
+        self.group_by = group_by
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        self.count = False
+        self.functions = defaultdict(set)
+
+        for function, field_names in six.iteritems(aggregates):
+            if function not in self.FUNCTIONS:
+                allowed = ', '.join(self.FUNCTIONS)
+                raise SyncanoValueError('Invalid aggregate "{0}" allowed are {1}.'.format(function, allowed))
+
+            if function == 'count' and field_names is True:
+                self.count = True
+                continue
+
+            if isinstance(field_names, six.string_types):
+                field_names = [field_names]
+            for field_name in field_names:
+                self.functions[field_name].add(function)
+
+        if not self.count and not self.functions:
+            raise SyncanoValueError('At least one aggregate is required.')
+
+    @property
+    def field_names(self):
+        field_names = set(self.functions)
+        if self.group_by:
+            field_names.add(self.group_by)
+        return sorted(field_names) or ['id']
+
+    def process(self):
+        states = defaultdict(self.get_state)
+        for page in self.manager._iter_raw_pages(prefetch=True):
+            groups = defaultdict(list)
+            for row in page:
+                groups[self.get_group(row)].append(row)
+
+            for group, rows in six.iteritems(groups):
+                state = states[group]
+                state['count'] += len(rows)
+                for field_name in self.functions:
+                    self.fold(state[field_name], [self.get_value(row, field_name) for row in rows], field_name)
+
+        if not self.group_by:
+            return self.get_results(states[None])
+        return {group: self.get_results(state) for group, state in six.iteritems(states)}
+
+    def get_state(self):
+        state = {'count': 0}
+        for field_name in self.functions:
+            state[field_name] = {'count': 0, 'sum': 0, 'min': None, 'max': None}
+        return state
+
+    def get_group(self, row):
+        if not self.group_by:
+            return None
+        value = self.get_value(row, self.group_by)
+        return tuple(value) if isinstance(value, list) else value
+
+    @classmethod
+    def get_value(cls, row, field_name):
+        value = row.get(field_name)
+        if isinstance(value, dict) and 'type' in value and 'value' in value:  # references and dates;
+            value = value['value']
+        return value
+
+    def fold(self, state, values, field_name):
+        """Adds the values of a page to the running state of a field."""
+        values = [value for value in values if value is not None]
+        if not values:
+            return
+
+        functions = self.functions[field_name]
+        is_numeric = all(isinstance(value, six.integer_types + (float,)) and not isinstance(value, bool)
+                         for value in values)
+        if not is_numeric and functions.intersection(self.NUMERIC_FUNCTIONS):
+            raise SyncanoValueError('Field "{0}" has not numeric values.'.format(field_name))
+
+        if is_numeric and self.use_numpy:
+            array = numpy.asarray(values)
+            page_sum, page_min, page_max = array.sum().item(), array.min().item(), array.max().item()
+        else:
+            page_sum = sum(values) if is_numeric else 0
+            page_min, page_max = min(values), max(values)
+
+        state['count'] += len(values)
+        state['sum'] += page_sum
+        state['min'] = page_min if state['min'] is None else min(state['min'], page_min)
+        state['max'] = page_max if state['max'] is None else max(state['max'], page_max)
+
+    def get_results(self, state):
+        results = {}
+        if self.count:
+            results['count'] = state['count']
+
+        for field_name, functions in six.iteritems(self.functions):
+            field_state = state[field_name]
+            for function in functions:
+                if function == 'avg':
+                    value = field_state['sum'] / float(field_state['count']) if field_state['count'] else None
+                else:
+                    value = field_state[function]
+                results['{0}__{1}'.format(field_name, function)] = value
+        return results
@@ -1,12 +1,13 @@
 
 
 import inspect
+import json
 
 import six
-from syncano.exceptions import SyncanoDoesNotExist, SyncanoValidationError
+from syncano.exceptions import SyncanoDoesNotExist, SyncanoValidationError, SyncanoValueError
 
 from . import fields
-from .manager import Manager
+from .manager import Manager, SchemaManager
 from .options import Options
 from .registry import registry
 
@@ -87,6 +88,9 @@ class Model(six.with_metaclass(ModelMetaclass)):
     def __init__(self, **kwargs):
         self.is_lazy = kwargs.pop('is_lazy', False)
         self._raw_data = {}
+        self._dirty_fields = None
+        self._clean_values = {}
+        self._prefetched_objects = {}
         self.to_python(kwargs)
 
     def __repr__(self):
@@ -120,9 +124,23 @@ class Model(six.with_metaclass(ModelMetaclass)):
         """
         Creates or updates the current instance.
         Override this in a subclass if you want to control the saving process.
+
+        An existing instance fetched from the API sends only the fields modified since it was loaded
+        as a ``PATCH`` request (an empty one when nothing changed), and only those fields are validated.
+        The ``update_fields`` argument selects the fields explicitly.
+
+        Usage::
+
+            book = Object.please.get(class_name='books', id=10)
+            book.title = 'New title'
+            book.save()  # PATCH {'title': 'New title'}
+
+            book.tags.append('new')
+            book.save()  # PATCH {'tags': [..., 'new']}
         """
-        self.validate()
-        data = self.to_native()
+        update_fields = self._get_update_fields(kwargs.get('update_fields'))
+        self.validate(field_names=update_fields)
+        data = self.to_native(field_names=update_fields)
         connection = self._get_connection(**kwargs)
         properties = self.get_endpoint_data()
         endpoint_name = 'list'
@@ -131,20 +149,29 @@ class Model(six.with_metaclass(ModelMetaclass)):
         if not self.is_new():
             endpoint_name = 'detail'
             methods = self._meta.get_endpoint_methods(endpoint_name)
-            if 'put' in methods:
+            if update_fields is not None:
+                method = 'PATCH'
+            elif 'put' in methods:
                 method = 'PUT'
 
         endpoint = self._meta.resolve_endpoint(endpoint_name, properties, method)
         if 'expected_revision' in kwargs:
             data.update({'expected_revision': kwargs['expected_revision']})
         request = {'data': data}
+        unit_of_work = registry.pending_unit_of_work
 
-        if not self.is_lazy:
+        if not self.is_lazy and unit_of_work is None:
             response = connection.request(method, endpoint, **request)
             self.to_python(response)
+            self.mark_clean()
             return self
 
-        return self.batch_object(method=method, path=endpoint, body=request['data'], properties=data)
+        batch_object = self.batch_object(method=method, path=endpoint, body=request['data'], properties=data)
+        if self.is_lazy:
+            return batch_object
+
+        unit_of_work.add(self, batch_object)
+        return self
 
     @classmethod
     def batch_object(cls, method, path, body, properties=None):
@@ -164,6 +191,86 @@ class Model(six.with_metaclass(ModelMetaclass)):
     def mark_for_batch(self):
         self.is_lazy = True
 
+    def get_prefetched(self, field_name):
+        """
+        Returns related objects loaded by ``prefetch_related`` for the given field:
+        an object (or None) for a reference field and a list of objects for a relation field.
+        """
+        if field_name not in self._prefetched_objects:
+            raise SyncanoValueError('Field "{0}" was not prefetched.'.format(field_name))
+        return self._prefetched_objects[field_name]
+
+    def set_prefetched(self, field_name, value):
+        self._prefetched_objects[field_name] = value
+
+    def mark_clean(self, field_names=None):
+        """
+        Starts tracking modified fields, all (or given) fields are treated as in sync with the API.
+        """
+        if field_names is None or self._dirty_fields is None:
+            self._dirty_fields = set()
+            self._clean_values = {}
+        else:
+            self._dirty_fields.difference_update(field_names)
+            for field_name in field_names:
+                self._clean_values.pop(field_name, None)
+
+    def get_dirty_fields(self):
+        """
+        Returns names of the fields modified since the instance was loaded from the API,
+        None when the instance was not loaded from the API.
+        """
+        if self._dirty_fields is None:
+            return None
+
+        # lists, dicts and schemas read since the instance was loaded could be changed in place;
+        fields_map = {field.name: field for field in self._meta.fields}
+        changed_fields = set(
+            name for name, fingerprint in six.iteritems(self._clean_values)
+            if self._get_fingerprint(fields_map[name], self._raw_data.get(name)) != fingerprint
+        )
+        return self._dirty_fields | changed_fields
+
+    def _watch_value(self, field, value):
+        """
+        Called when a list, dict or schema value of a field is read; its fingerprint from the first read
+        is compared on save, so loading objects which are never read or saved costs nothing.
+        """
+        if self._dirty_fields is None or field.name in self._clean_values:
+            return
+
+        if not field.read_only and field.has_data and field.name not in self._dirty_fields:
+            self._clean_values[field.name] = self._get_fingerprint(field, value)
+
+    @classmethod
+    def _get_fingerprint(cls, field, value):
+        if not isinstance(value, (list, dict, SchemaManager)):
+            return None
+        return json.dumps(field.to_native(value), sort_keys=True, default=repr)
+
+    def _get_update_fields(self, update_fields=None):
+        dirty_fields = self.get_dirty_fields()
+        if update_fields is None and dirty_fields is None:
+            return None
+
+        if self.is_new():
+            if update_fields is not None:
+                raise SyncanoValidationError('"update_fields" allowed only on existing model.')
+            return None
+
+        if not self._meta.is_http_method_available('PATCH', 'detail'):
+            return None
+
+        if update_fields is None:
+            # an unchanged instance is saved with an empty PATCH;
+            update_fields = dirty_fields
+        else:
+            for field_name in update_fields:
+                self._meta.get_field(field_name)
+
+        fields_map = {field.name: field for field in self._meta.fields}
+        return set(name for name in update_fields if not fields_map[name].read_only and fields_map[name].has_data)
+
     def delete(self, **kwargs):
         """Removes the current instance.
         """
@@ -173,8 +280,18 @@ class Model(six.with_metaclass(ModelMetaclass)):
         properties = self.get_endpoint_data()
         http_method = 'DELETE'
         endpoint = self._meta.resolve_endpoint('detail', properties, http_method)
+        unit_of_work = registry.pending_unit_of_work
+        if unit_of_work is not None:
+            unit_of_work.add(self, self.batch_object(method=http_method, path=endpoint, body={}))
+            return
+
         connection = self._get_connection(**kwargs)
         connection.request(http_method, endpoint)
+        self._clear_deleted()
+
+    def _clear_deleted(self):
+        if registry.identity_map is not None:
+            registry.identity_map.discard(self)
         if self.__class__.__name__ == 'Instance':  # avoid circular import;
             registry.clear_used_instance()
         self._raw_data = {}
@@ -191,14 +308,21 @@ class Model(six.with_metaclass(ModelMetaclass)):
         connection = self._get_connection(**kwargs)
         response = connection.request(http_method, endpoint)
         self.to_python(response)
+        self.mark_clean()
 
-    def validate(self):
+    def validate(self, field_names=None):
         """
         Validates the current instance.
 
+        :type field_names: set
+        :param field_names: Validate only selected fields
+
         :raises: SyncanoValidationError, SyncanoFieldError
         """
         for field in self._meta.fields:
+            if field_names is not None and field.name not in field_names:
+                continue
+
             if not field.read_only:
                 value = getattr(self, field.name)
                 field.validate(value, self)
@@ -249,15 +373,23 @@ class Model(six.with_metaclass(ModelMetaclass)):
             if isinstance(field, fields.RelationField):
                 setattr(self, "{}_set".format(field_name), field(instance=self, field_name=field_name))
 
-    def to_native(self):
+    def to_native(self, field_names=None):
         """Converts the current instance to raw data which
         can be serialized to JSON and send to API.
+
+        :type field_names: set
+        :param field_names: Convert only selected fields; blank ones are sent as null
         """
         data = {}
         for field in self._meta.fields:
+            if field_names is not None and field.name not in field_names:
+                continue
+
             if not field.read_only and field.has_data:
                 value = getattr(self, field.name)
                 if value is None and field.blank:
+                    if field_names is not None:
+                        data[field.mapping or field.name] = None
                     continue
 
                 if field.mapping:
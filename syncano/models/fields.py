@@ -95,7 +95,10 @@ class Field(object):
 
     def __get__(self, instance, owner):
         if instance is not None:
-            return instance._raw_data.get(self.name, self.default)
+            value = instance._raw_data.get(self.name, self.default)
+            if isinstance(value, (list, dict, SchemaManager)) and hasattr(instance, '_watch_value'):
+                instance._watch_value(self, value)  # it can be changed in place;
+            return value
 
     def __set__(self, instance, value):
         if self.read_only and value and instance._raw_data.get(self.name):
@@ -104,10 +107,18 @@ class Field(object):
 
         instance._raw_data[self.name] = self.to_python(value)
 
+        dirty_fields = getattr(instance, '_dirty_fields', None)
+        if dirty_fields is not None:
+            dirty_fields.add(self.name)
+
     def __delete__(self, instance):
         if self.name in instance._raw_data:
             del instance._raw_data[self.name]
 
+            dirty_fields = getattr(instance, '_dirty_fields', None)
+            if dirty_fields is not None:
+                dirty_fields.add(self.name)
+
     def validate(self, value, model_instance):
         """
         Validates the current field instance.
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+import math
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime
+
+import six
+from syncano.exceptions import SyncanoValueError
+
+from .fields import DateTimeField
+from .geo import Distance, GeoPoint
+
+LOOKUP_SEPARATOR = '__'
+
+# Mean Earth radius in kilometers and miles
+EARTH_RADIUS = {
+    Distance.KILOMETERS: 6371.0088,
+    Distance.MILES: 3958.7613,
+}
+
+
+def normalize(value):
+    """Converts a value of a model or of a raw API response to the form used by the comparisons."""
+    if isinstance(value, dict):
+        if 'type' in value and 'value' in value:  # references, files and dates in raw responses;
+            value = value['value']
+        elif 'latitude' in value and 'longitude' in value:
+            return value['latitude'], value['longitude']
+
+    if isinstance(value, GeoPoint):
+        return value.latitude, value.longitude
+
+    if isinstance(value, datetime):
+        return value.strftime(DateTimeField.FORMAT) + 'Z'
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+
+    if hasattr(value, '_meta') and hasattr(value, 'pk'):  # referenced model;
+        return value.pk
+    return value
+
+
+def get_value(obj, field_name):
+    if isinstance(obj, dict):
+        return normalize(obj.get(field_name))
+    return normalize(getattr(obj, field_name, None))
+
+
+def _comparison(operator):
+    def lookup(value, query):
+        if value is None or query is None:
+            return False
+        try:
+            return operator(value, query)
+        except TypeError:  # values of different types do not match;
+            return False
+    return lookup
+
+
+def _string_lookup(operator, ignore_case=False):
+    def lookup(value, query):
+        if not isinstance(value, six.string_types) or not isinstance(query, six.string_types):
+            return False
+        if ignore_case:
+            value, query = value.lower(), query.lower()
+        return operator(value, query)
+    return lookup
+
+
+def _contains(value, query):
+    if isinstance(value, list):
+        query = query if isinstance(query, list) else [query]
+        return all(item in value for item in query)
+    return _string_lookup(lambda v, q: q in v)(value, query)
+
+
+def _near(value, query):
+    if not isinstance(value, tuple):
+        return False
+
+    if isinstance(query, dict):
+        query = dict(query)
+        point = (query.pop('latitude'), query.pop('longitude'))
+        distance = Distance(**query)
+    else:
+        point, distance = normalize(query[0]), query[1]
+
+    latitude, longitude = [math.radians(coordinate) for coordinate in value]
+    query_latitude, query_longitude = [math.radians(coordinate) for coordinate in point]
+    haversine = (math.sin((query_latitude - latitude) / 2) ** 2 +
+                 math.cos(latitude) * math.cos(query_latitude) * math.sin((query_longitude - longitude) / 2) ** 2)
+    return 2 * EARTH_RADIUS[distance.unit] * math.asin(math.sqrt(haversine)) <= distance.distance
+
+
+LOOKUPS = {
+    'eq': lambda value, query: value == query,
+    'neq': lambda value, query: value != query,
+    'gt': _comparison(lambda value, query: value > query),
+    'gte': _comparison(lambda value, query: value >= query),
+    'lt': _comparison(lambda value, query: value < query),
+    'lte': _comparison(lambda value, query: value <= query),
+    'exists': lambda value, query: (value is not None) == bool(query),
+    'in': lambda value, query: value in query,
+    'contains': _contains,
+    'startswith': _string_lookup(lambda value, query: value.startswith(query)),
+    'endswith': _string_lookup(lambda value, query: value.endswith(query)),
+    'istartswith': _string_lookup(lambda value, query: value.startswith(query), ignore_case=True),
+    'iendswith': _string_lookup(lambda value, query: value.endswith(query), ignore_case=True),
+    'icontains': _string_lookup(lambda value, query: query in value, ignore_case=True),
+    'ieq': _string_lookup(lambda value, query: value == query, ignore_case=True),
+    'near': _near,
+}
+
+
+def _sort_group(value):
+    if isinstance(value, six.string_types):
+        return six.string_types
+    if isinstance(value, six.integer_types + (float,)) and not isinstance(value, bool):
+        return 'number'
+    return type(value)
+
+
+class HashIndex(object):
+    """Maps values of a field to positions of objects; used by the ``eq`` and ``in`` lookups."""
+    lookups = ('eq', 'in')
+
+    def __init__(self, field_name, objects):
+        self.positions = defaultdict(set)
+        self.unindexed = set()
+        for position, obj in enumerate(objects):
+            value = get_value(obj, field_name)
+            try:
+                self.positions[value].add(position)
+            except TypeError:  # unhashable values (arrays) are always checked;
+                self.unindexed.add(position)
+
+    def find(self, lookup, query):
+        queries = [query] if lookup == 'eq' else query
+        found = set(self.unindexed)
+        try:
+            for value in queries:
+                found.update(self.positions.get(value, ()))
+        except TypeError:
+            return None
+        return found
+
+
+class SortedIndex(object):
+    """Keeps values of a field sorted; used by the comparison, ``eq`` and ``startswith`` lookups."""
+    lookups = ('eq', 'gt', 'gte', 'lt', 'lte', 'startswith')
+
+    def __init__(self, field_name, objects):
+        values = [(get_value(obj, field_name), position) for position, obj in enumerate(objects)]
+        groups = [_sort_group(value) for value, _ in values if value is not None]
+        self.group = max(set(groups), key=groups.count) if groups else None
+
+        indexed = sorted((value, position) for value, position in values
+                         if value is not None and _sort_group(value) == self.group)
+        self.values = [value for value, _ in indexed]
+        self.sorted_positions = [position for _, position in indexed]
+        self.unindexed = set(position for value, position in values
+                             if value is not None and _sort_group(value) != self.group)
+
+    def find(self, lookup, query):
+        if query is None or _sort_group(query) != self.group:
+            return None
+
+        if lookup == 'startswith':
+            if not isinstance(query, six.string_types) or not query:
+                return None
+            start = bisect_left(self.values, query)
+            stop = bisect_left(self.values, query[:-1] + six.unichr(ord(query[-1]) + 1))
+        else:
+            start, stop = {
+                'eq': lambda: (bisect_left(self.values, query), bisect_right(self.values, query)),
+                'gt': lambda: (bisect_right(self.values, query), len(self.values)),
+                'gte': lambda: (bisect_left(self.values, query), len(self.values)),
+                'lt': lambda: (0, bisect_left(self.values, query)),
+                'lte': lambda: (0, bisect_right(self.values, query)),
+            }[lookup]()
+
+        return set(self.sorted_positions[start:stop]) | self.unindexed
+
+
+class LocalStore(object):
+    """
+    Evaluates data object lookups against objects held in memory, with the same semantics as
+    ``ObjectManager.filter``; objects can be models or raw dicts from the API.
+
+    Usage::
+
+        store = LocalStore(countries, hash_indexes=['code'], sorted_indexes=['population'])
+        store.filter(code__in=['PL', 'DE'])
+        store.filter(population__gte=10 ** 6, name__istartswith='po')
+        store.query({'population__gt': 10 ** 6}, order_by='-population', limit=10)
+
+    Hash indexes speed up the ``eq`` and ``in`` lookups, sorted indexes the comparisons and ``startswith``;
+    other conditions are checked object by object. The ``is`` lookup on reference and relation fields
+    (``<field>__<related field>__<lookup>``) needs a store with the related objects::
+
+        books = LocalStore(book_objects, related={'author': LocalStore(author_objects)})
+        books.filter(author__name__startswith='A')
+    """
+
+    def __init__(self, objects, hash_indexes=(), sorted_indexes=(), related=None):
+        self.objects = list(objects)
+        self.related = related or {}
+        self.indexes = defaultdict(list)
+
+        for field_name in hash_indexes:
+            self.indexes[field_name].append(HashIndex(field_name, self.objects))
+        for field_name in sorted_indexes:
+            self.indexes[field_name].append(SortedIndex(field_name, self.objects))
+
+    def __len__(self):
+        return len(self.objects)
+
+    def filter(self, **lookups):
+        return self.query(lookups)
+
+    def query(self, lookups, order_by=None, limit=None):
+        conditions = [self._get_condition(name, query) for name, query in six.iteritems(lookups)]
+
+        candidates = None
+        for field_name, lookup, query in conditions:
+            found = self._find(field_name, lookup, query)
+            if found is not None:
+                candidates = found if candidates is None else candidates & found
+
+        positions = sorted(candidates) if candidates is not None else range(len(self.objects))
+        results = [self.objects[position] for position in positions
+                   if all(self._match(self.objects[position], *condition) for condition in conditions)]
+
+        if order_by:
+            field_name = order_by.lstrip('-')
+            results.sort(key=lambda obj: self._sort_key(get_value(obj, field_name)), reverse=order_by.startswith('-'))
+        return results[:limit] if limit else results
+
+    def _get_condition(self, name, query):
+        related_name = None
+        parts = name.split(LOOKUP_SEPARATOR)
+        if len(parts) == 1:
+            field_name, lookup = name, 'eq'
+        elif len(parts) == 2:
+            field_name, lookup = parts
+        else:
+            related_name, field_name, lookup = parts[0], parts[1], LOOKUP_SEPARATOR.join(parts[2:])
+
+        if lookup not in LOOKUPS and lookup != 'is':
+            allowed = ', '.join(sorted(LOOKUPS))
+            raise SyncanoValueError('Invalid lookup type "{0}" allowed are {1}.'.format(lookup, allowed))
+
+        if lookup == 'is' and related_name is None:
+            raise SyncanoValueError('Use <field>__<related field>__<lookup> to query related objects.')
+
+        if lookup != 'near':
+            query = normalize(query)
+
+        if related_name is None:
+            return field_name, lookup, query
+
+        if related_name not in self.related:
+            raise SyncanoValueError('Lookup on "{0}" needs a store with the related objects.'.format(related_name))
+
+        related_ids = set(get_value(obj, 'id') for obj in self.related[related_name].query(
+            {'{0}{1}{2}'.format(field_name, LOOKUP_SEPARATOR, lookup): query}))
+        return related_name, 'is', related_ids
+
+    def _find(self, field_name, lookup, query):
+        for index in self.indexes.get(field_name, ()):
+            if lookup in index.lookups:
+                found = index.find(lookup, query)
+                if found is not None:
+                    return found
+
+    @classmethod
+    def _match(cls, obj, field_name, lookup, query):
+        value = get_value(obj, field_name)
+        if lookup == 'is':
+            values = value if isinstance(value, list) else [value]
+            return any(item in query for item in values if item is not None)
+        return LOOKUPS[lookup](value, query)
+
+    @classmethod
+    def _sort_key(cls, value):
+        return value is None, _sort_group(value) is not six.string_types, value
@@ -1,18 +1,41 @@
 import json
+import random
+import time
 from copy import deepcopy
+from itertools import islice
+from multiprocessing.pool import ThreadPool
 
 import six
-from syncano.connection import ConnectionMixin
-from syncano.exceptions import SyncanoRequestError, SyncanoValidationError, SyncanoValueError
-from syncano.models.bulk import ModelBulkCreate, ObjectBulkCreate
-from syncano.models.manager_mixins import ArrayOperationsMixin, IncrementMixin, clone
+from syncano.connection import Connection, ConnectionMixin
+from syncano.exceptions import RevisionMismatchException, SyncanoRequestError, SyncanoValidationError, SyncanoValueError
+from syncano.models.aggregates import ObjectAggregate
+from syncano.models.bulk import BaseBulkCreate, ModelBulkCreate, ObjectBulkCreate
+from syncano.models.changes import ChangeFeed
+from syncano.models.manager_mixins import ArrayOperationsMixin, IncrementMixin, RelationOperationsMixin, clone
+from syncano.models.replicas import ObjectReplica
+from syncano.models.transfers import ObjectExport, ObjectImport
+from syncano.utils import Deadline, map_concurrently
 
 from .registry import registry
 
+if six.PY3:
+    from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+else:
+    from urllib import urlencode
+    from urlparse import parse_qsl, urlsplit, urlunsplit
+
 # The maximum number of items to display in a Manager.__repr__
 REPR_OUTPUT_SIZE = 20
 
 
+def update_url_query(url, **params):
+    """Sets (or removes when the value is None) query parameters of the provided url."""
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k not in params]
+    query.extend((k, v) for k, v in sorted(six.iteritems(params)) if v is not None)
+    return urlunsplit((scheme, netloc, path, urlencode(query), fragment))
+
+
 class ManagerDescriptor(object):
 
     def __init__(self, manager):
@@ -29,6 +52,16 @@ class Manager(ConnectionMixin):
 
     BATCH_URI = '/v1.1/instances/{name}/batch/'
 
+    # The page size used to walk over the objects skipped by slicing
+    SKIP_PAGE_SIZE = 1000
+
+    # The number of objects fetched and sent at once by the queryset update and delete
+    BULK_PAGE_SIZE = 500
+
+    # The default number of update_with retries and the base delay (in seconds) between them
+    UPDATE_RETRIES = 3
+    RETRY_DELAY = 0.1
+
     def __init__(self):
         self.name = None
         self.model = None
@@ -46,6 +79,10 @@ class Manager(ConnectionMixin):
         self._serialize = True
         self._connection = None
         self._template = None
+        self._start_path = None
+        self._priority = None
+        self._timeout = None
+        self._token = None
 
     def __repr__(self):  # pragma: no cover
         data = list(self[:REPR_OUTPUT_SIZE + 1])
@@ -59,25 +96,17 @@ class Manager(ConnectionMixin):
     def __unicode__(self):  # pragma: no cover
         return six.u(str(self))
 
-    def __len__(self):  # pragma: no cover
-        return self.iterator()
+    def __len__(self):
+        raise TypeError('{0} does not report the objects count, iterate over it instead.'.format(self))
 
     def __iter__(self):  # pragma: no cover
         return iter(self.iterator())
 
     def __nonzero__(self):
-        try:
-            self[0]
-            return True
-        except IndexError:
-            return False
+        return self.exists()
 
     def __bool__(self):  # pragma: no cover
-        try:
-            self[0]
-            return True
-        except IndexError:
-            return False
+        return self.exists()
 
     def __getitem__(self, k):
         """
@@ -93,12 +122,64 @@ class Manager(ConnectionMixin):
         manager = self._clone()
 
         if isinstance(k, slice):
-            if k.stop is not None:
-                manager.limit(int(k.stop) + 1)
-            return list(manager)[k.start:k.stop:k.step]
+            return list(manager._iterate_window(k.start or 0, k.stop))[::k.step]
+
+        results = list(manager._iterate_window(k, k + 1))
+        if not results:
+            raise IndexError('Manager index out of range.')
+        return results[0]
+
+    def _iterate_window(self, start, stop):
+        """
+        Iterates over results from start to stop; pages before start are walked with
+        large, not serialized pages and only the requested window is fetched in full.
+        """
+        if self._template:
+            return iter(list(self.iterator())[start:stop])
+
+        if self._limit:
+            stop = self._limit if stop is None else min(stop, self._limit)
+
+        if stop is not None and stop <= start:
+            return iter([])
 
-        manager.limit(k + 1)
-        return list(manager)[k]
+        self._limit = None if stop is None else stop - start
+        if start:
+            self._start_path = self._skip(start)
+            if self._start_path is None:
+                return iter([])
+        return self.iterator()
+
+    def _skip(self, offset):
+        """Moves the pagination cursor by offset objects; returns the path of the next page or None."""
+        skip_manager = self._clone()
+        skip_manager._serialize = False
+        skip_manager._start_path = None
+        skip_manager.query.update(self._get_skip_query(min(offset, self.SKIP_PAGE_SIZE)))
+
+        response = skip_manager.request()
+        skipped = 0
+        while True:
+            objects = response.get('objects')
+            next_url = response.get('next')
+            skipped += len(objects or [])
+
+            if not objects or not next_url:
+                return None
+
+            if skipped >= offset:
+                break
+
+            page_size = min(offset - skipped, self.SKIP_PAGE_SIZE)
+            response = skip_manager.request(path=update_url_query(next_url, page_size=page_size), params={})
+
+        page_size = self.query.get('page_size')
+        if not page_size and self._limit:
+            page_size = min(self._limit, self.SKIP_PAGE_SIZE)
+        return update_url_query(next_url, page_size=page_size, fields=self.query.get('fields'))
+
+    def _get_skip_query(self, page_size):
+        return {'page_size': page_size}
 
     def _set_default_properties(self, endpoint_properties):
         for field in self.model._meta.fields:
@@ -196,11 +277,12 @@ class Manager(ConnectionMixin):
                 meta.append(arg['meta'])
                 requests.append(arg['body'])
 
-        response = self.connection.request(
-            'POST',
-            self.BATCH_URI.format(name=registry.instance_name),
-            **{'data': {'requests': requests}}
-        )
+        with self._get_deadline():
+            response = self.connection.request(
+                'POST',
+                self.BATCH_URI.format(name=registry.instance_name),
+                **self._get_batch_request(requests)
+            )
 
         populated_response = []
 
@@ -210,12 +292,20 @@ class Manager(ConnectionMixin):
                 model = meta['model']
                 properties = meta['properties']
                 content.update(properties)
-                populated_response.append(model(**content))
+                populated_response.append(self._track(model(**content)))
             else:
                 populated_response.append(res)
 
         return populated_response
 
+    def _batch_chunks(self, requests):
+        """Sends any number of batch objects as consecutive batch requests of the allowed size."""
+        results = []
+        for start in range(0, len(requests), BaseBulkCreate.MAX_BATCH_SIZE):
+            with self._slot():
+                results.extend(self.batch(*requests[start:start + BaseBulkCreate.MAX_BATCH_SIZE]))
+        return results
+
     # Object actions
     def create(self, **kwargs):
         """
@@ -313,11 +403,12 @@ class Manager(ConnectionMixin):
             {'method': 'GET', 'path': '{path}{id}/'.format(path=path, id=object_id)} for object_id in object_ids_list
         ]
 
-        response = self.connection.request(
-            'POST',
-            self.BATCH_URI.format(name=registry.instance_name),
-            **{'data': {'requests': requests}}
-        )
+        with self._get_deadline():
+            response = self.connection.request(
+                'POST',
+                self.BATCH_URI.format(name=registry.instance_name),
+                **self._get_batch_request(requests)
+            )
 
         bulk_response = {}
 
@@ -325,7 +416,7 @@ class Manager(ConnectionMixin):
             if object['code'] == 200:
                 data = object['content'].copy()
                 data.update(self.properties)
-                bulk_response[object_id] = self.model(**data)
+                bulk_response[object_id] = self._track(self.model(**data))
             else:
                 bulk_response[object_id] = object
 
@@ -449,21 +540,51 @@ class Manager(ConnectionMixin):
             path, defaults = self._get_endpoint_properties()
             return [self.model.batch_object(method=self.method, path=path, body=serialized, properties=defaults)]
 
-        instances = []  # ObjectManager context;
-        for obj in self:
-            self._filter(*(), **kwargs)
-            serialized = self._get_serialized_data()
-            self.properties.update({'id': obj.id})
-            path, defaults = self._get_endpoint_properties()
-            updated_instance = self.model.batch_object(method=self.method, path=path, body=serialized,
-                                                       properties=defaults)
+        # ObjectManager context: the same changes are sent for every matching object;
+        serialized = self._get_serialized_data()
+        requests = self._get_matching_requests(self.method, serialized)
 
-        instances.append(updated_instance)  # always a batch structure here;
+        if self.is_lazy:
+            return [batch_object for _, batch_object in requests]
 
-        if not self.is_lazy:
-            instances = self.batch(instances)
+        return [result for _, result in self._send_matching_requests(requests)]
 
-        return instances
+    def _get_matching_requests(self, method, body):
+        """
+        Yields (id, batch object) pairs for the objects matching the current query; only the ids are fetched,
+        one page at a time.
+        """
+        id_manager = self._clone()
+        id_manager.query.update(self._get_skip_query(self.BULK_PAGE_SIZE))
+        id_manager._serialize = False
+        id_manager.method = 'GET'
+        id_manager.endpoint = 'list'
+
+        manager = self._clone()
+        manager.endpoint = 'detail'
+        for data in id_manager.iterator():
+            manager.properties['id'] = data['id']
+            path, defaults = manager._get_endpoint_properties()
+            yield data['id'], self.model.batch_object(method=method, path=path, body=body, properties=defaults)
+
+    def _send_matching_requests(self, requests):
+        """
+        Sends (id, batch object) pairs as concurrent batch requests, ``BULK_PAGE_SIZE`` requests at a time;
+        yields (id, result) pairs.
+        """
+        self._as_background()
+        requests = iter(requests)
+        while True:
+            page = list(islice(requests, self.BULK_PAGE_SIZE))
+            if not page:
+                break
+
+            chunks = [page[start:start + BaseBulkCreate.MAX_BATCH_SIZE]
+                      for start in range(0, len(page), BaseBulkCreate.MAX_BATCH_SIZE)]
+            responses = self._map_concurrently(lambda chunk: self.batch(*[request for _, request in chunk]), chunks)
+            for chunk, response in zip(chunks, responses):
+                for (object_id, _), result in zip(chunk, response):
+                    yield object_id, result
 
     @clone
     def old_update(self, *args, **kwargs):
@@ -542,6 +663,66 @@ class Manager(ConnectionMixin):
             created = False
         return instance, created
 
+    def update_with(self, fn, *args, **kwargs):
+        """
+        A read-modify-write helper for models with a revision (data objects, classes). Loads the object,
+        calls ``fn`` with it and saves it with ``expected_revision``; when somebody else changed the object
+        in the meantime it is loaded again and ``fn`` is re-applied, up to ``retries`` times,
+        waiting a growing, randomized delay between the attempts.
+
+        Usage::
+
+            def add_view(book):
+                book.views += 1
+
+            book = Object.please.update_with(add_view, class_name='books', id=10, retries=5)
+
+        :param fn: a callable modifying the object in place; it can be called many times;
+        :param retries: the number of retries after a revision mismatch; Default to 3;
+        :return: the saved object;
+        :raises: RevisionMismatchException when all retries failed;
+        """
+        retries = kwargs.pop('retries', self.UPDATE_RETRIES)
+        if 'revision' not in self.model._meta.field_names:
+            raise SyncanoValueError('{0} has no revision field.'.format(self.model.__name__))
+
+        attempt = 0
+        while True:
+            instance = self.get(*args, **kwargs)
+            fn(instance)
+            try:
+                return instance.save(expected_revision=instance.revision)
+            except RevisionMismatchException:
+                if attempt >= retries:
+                    raise
+                time.sleep(self.RETRY_DELAY * 2 ** attempt * (1 + random.random()))
+                attempt += 1
+
+    @clone
+    def bulk_update_with(self, fn, object_ids_list, **kwargs):
+        """
+        Runs ``update_with`` for many objects using a pool of threads.
+
+        Usage::
+
+            results = Object.please.bulk_update_with(add_view, [10, 11, 12], class_name='books', retries=5)
+
+        :param fn: a callable modifying the object in place; it can be called concurrently and many times;
+        :param object_ids_list: a list of the primary keys;
+        :return: a dict in which keys are the object_ids_list elements and values are the saved objects,
+         or the raised :class:`~syncano.exceptions.SyncanoRequestError` for objects which could not be updated;
+        """
+        self._as_background()
+        pk_name = self.model._meta.pk.name
+
+        def update(object_id):
+            try:
+                return self.update_with(fn, **dict(kwargs, **{pk_name: object_id}))
+            except SyncanoRequestError as e:
+                return e
+
+        return dict(zip(object_ids_list, self._map_concurrently(update, object_ids_list)))
+
     # List actions
 
     @clone
@@ -583,9 +764,26 @@ class Manager(ConnectionMixin):
         try:
             self._limit = 1
             return self.list(*args, **kwargs)[0]
-        except KeyError:
+        except (KeyError, IndexError):
             return None
 
+    @clone
+    def exists(self):
+        """
+        Returns True if there is at least one object matching the lookup parameters.
+        Only a single, not serialized object is requested.
+
+        Usage::
+
+            if Instance.please.list().exists():
+                ...
+        """
+        self.method = 'GET'
+        self.query['page_size'] = 1
+        self._serialize = False
+        response = self.request()
+        return bool(response.get('objects'))
+
     @clone
     def page_size(self, value):
         """
@@ -670,6 +868,69 @@ class Manager(ConnectionMixin):
         self.connection = connection
         return self
 
+    @clone
+    def priority(self, priority):
+        """
+        Sets the priority of parallel operations of the manager; when all slots of the connection
+        governor are taken, waiting tasks are started in the priority order (lower first).
+        With an explicit priority each page request of an iteration takes a slot as well,
+        so a plain scan can give way to interactive requests.
+
+        Usage::
+
+            for obj in Object.please.priority(Connection.PRIORITY_BACKGROUND).list(class_name='books'):
+                ...
+        """
+        self._priority = priority
+        return self
+
+    @clone
+    def timeout(self, seconds=None, token=None):
+        """
+        Sets a deadline (in seconds) for each operation of the manager, e.g. a whole iteration over
+        all pages or a batch request, and an optional :class:`~syncano.utils.CancellationToken`.
+
+        Usage::
+
+            token = CancellationToken()
+            for obj in Object.please.timeout(60, token=token).list(class_name='books'):
+                ...
+
+        :raises SyncanoDeadlineExceeded: if the deadline passes
+        :raises SyncanoOperationCancelled: if the token is cancelled
+        """
+        self._timeout = seconds
+        self._token = token
+        return self
+
+    def _get_deadline(self):
+        # a new deadline for each operation, it never extends a deadline of the calling code;
+        return Deadline(self._timeout, self._token)
+
+    def _as_background(self):
+        # bulk operations give way to interactive requests unless a priority was set explicitly;
+        if self._priority is None:
+            self._priority = Connection.PRIORITY_BACKGROUND
+
+    def _get_priority(self):
+        return self._priority if self._priority is not None else Connection.PRIORITY_INTERACTIVE
+
+    def _slot(self):
+        # a slot of the connection governor for a step of a sequential bulk operation;
+        return self.connection.governor.slot(self._get_priority())
+
+    def _request_page(self, function, **kwargs):
+        # single requests are never throttled, unless the manager has an explicit priority;
+        if self._priority is None:
+            return function(**kwargs)
+        with self._slot():
+            return function(**kwargs)
+
+    def _map_concurrently(self, function, items, workers=None):
+        # parallel tasks take slots of the connection governor, single requests are never throttled;
+        return map_concurrently(function, items, workers=workers, governor=self.connection.governor,
+                                priority=self._get_priority())
+
     # Other stuff
 
     def contribute_to_class(self, model, name):  # pragma: no cover
@@ -712,6 +973,9 @@ class Manager(ConnectionMixin):
         manager.model = self.model
         manager._connection = self._connection
         manager._template = self._template
+        manager._priority = self._priority
+        manager._timeout = self._timeout
+        manager._token = self._token
         manager.endpoint = self.endpoint
         manager.properties = deepcopy(self.properties)
         manager._limit = self._limit
@@ -740,6 +1004,12 @@ class Manager(ConnectionMixin):
         properties.update(data)
         return model(**properties) if self._serialize else data
 
+    def _track(self, instance):
+        """Marks the instance built from an API response as clean and resolves it in the current session."""
+        if hasattr(instance, 'mark_clean'):
+            instance.mark_clean()
+        return registry.resolve_identity(instance)
+
     def build_request(self, request):
         if 'params' not in request and self.query:
             request['params'] = self.query
@@ -769,7 +1039,8 @@ class Manager(ConnectionMixin):
         self.build_request(request)
 
         try:
-            response = self.connection.request(method, path, **request)
+            with self._get_deadline():
+                response = self.connection.request(method, path, **request)
         except SyncanoRequestError as e:
             if e.status_code == 404:
                 obj_id = path.rsplit('/')[-2]
@@ -777,10 +1048,13 @@ class Manager(ConnectionMixin):
             raise
 
         if 'next' not in response and not self._template:
-            return self.serialize(response)
+            return self._track(self.serialize(response))
 
         return response
 
+    def _get_batch_request(self, requests):
+        return {'data': {'requests': requests}}
+
     def get_allowed_method(self, *methods):
         meta = self.model._meta
         allowed_methods = meta.get_endpoint_methods(self.endpoint)
@@ -795,7 +1069,9 @@ class Manager(ConnectionMixin):
     def iterator(self):
         """Pagination handler"""
 
-        response = self._get_response()
+        deadline = self._get_deadline()
+        with deadline:
+            response = self._request_page(self._get_response)
         results = 0
         while True:
             if self._template:
@@ -804,19 +1080,62 @@ class Manager(ConnectionMixin):
             objects = response.get('objects')
             next_url = response.get('next')
 
-            for o in objects:
-                if self._limit and results >= self._limit:
-                    break
+            page = objects[:self._limit - results] if self._limit else objects
+            page = [self._track(self.serialize(o)) for o in page]
+            results += len(page)
 
-                results += 1
-                yield self.serialize(o)
+            for o in self._process_page(page):
+                yield o
 
             if not objects or not next_url or (self._limit and results >= self._limit):
                 break
 
-            response = self.request(path=next_url)
+            with deadline:
+                response = self._request_page(self.request, path=next_url)
+
+    def _iter_raw_pages(self, prefetch=False):
+        """
+        Yields pages of objects exactly as returned by the API, without building models;
+        with ``prefetch`` the next page is requested in the background while the current one is processed.
+        """
+        pool = ThreadPool(1) if prefetch else None
+        deadline = self._get_deadline()
+        try:
+            with deadline:
+                response = self._request_page(self._get_response)
+            results = 0
+            while True:
+                objects = response.get('objects') or []
+                next_url = response.get('next')
+
+                page = objects[:self._limit - results] if self._limit else objects
+                results += len(page)
+                is_last = not objects or not next_url or (self._limit and results >= self._limit)
+
+                next_page = None
+                if pool and not is_last:
+                    with deadline as current:
+                        fetch = self.connection.governor.wrap(self.request, self._get_priority())
+                        next_page = pool.apply_async(current.wrap(fetch), kwds={'path': next_url})
+
+                if page:
+                    yield page
+
+                if is_last:
+                    break
+                with deadline:
+                    response = next_page.get() if next_page else self._request_page(self.request, path=next_url)
+        finally:
+            if pool:
+                pool.terminate()
+
+    def _process_page(self, objects):
+        """Hook called with each serialized page of results before it is yielded."""
+        return objects
 
     def _get_response(self):
+        if self._start_path:
+            return self.request(path=self._start_path, params={})
         return self.request()
 
     def _get_instance(self, attrs):
@@ -874,7 +1193,7 @@ class ScriptEndpointManager(Manager):
         return registry.ScriptEndpointTrace(**response)
 
 
-class ObjectManager(IncrementMixin, ArrayOperationsMixin, Manager):
+class ObjectManager(IncrementMixin, ArrayOperationsMixin, RelationOperationsMixin, Manager):
     """
     Custom :class:`~syncano.models.manager.Manager`
     class for :class:`~syncano.models.base.Object` model.
@@ -890,9 +1209,47 @@ class ObjectManager(IncrementMixin, ArrayOperationsMixin, Manager):
         'ieq', 'near',
     ]
 
+    # The maximum length of the url encoded query; longer ``__in`` lookups are split into many requests
+    MAX_QUERY_LENGTH = 2000
+
     def __init__(self):
         super(ObjectManager, self).__init__()
         self._initial_response = None
+        self._counted_response = None
+        self._prefetch_related = []
+        self._split_queries = None
+        self._length_hint_pending = False
+
+    def __iter__(self):
+        # ``list(manager)`` asks for the length right after ``iter(manager)``, see __len__;
+        self._length_hint_pending = True
+        return self._iterate()
+
+    def __len__(self):
+        """
+        Returns the count reported by the API; the first page is requested together with the count
+        and reused by the next iteration, so ``len(manager)`` followed by ``list(manager)`` makes a single
+        request per page. The length hint asked by ``list(manager)`` itself is refused, so a plain
+        ``list()`` does not make the API count the objects.
+        """
+        if self._length_hint_pending:
+            self._length_hint_pending = False
+            raise TypeError('{0} is being iterated, use count() or len() before the iteration.'.format(self))
+
+        if self._split_queries:
+            raise TypeError('{0} with a split query does not report the objects count, use count().'.format(self))
+
+        if self._initial_response is None and self._counted_response is None:
+            self._counted_response = self.request(params=dict(self.query, include_count=True))
+
+        response = self._initial_response or self._counted_response
+        if not isinstance(response, dict) or 'objects_count' not in response:
+            raise TypeError('{0} does not report the objects count.'.format(self))
+
+        count = response['objects_count']
+        if self._limit:
+            return min(count, self._limit)
+        return count
 
     def serialize(self, data, model=None):
         model = model or self.model.get_subclass_model(**self.properties)
@@ -911,6 +1268,10 @@ class ObjectManager(IncrementMixin, ArrayOperationsMixin, Manager):
 
         :return: The count of the returned objects: count = DataObjects.please.list(...).count();
         """
+        if self._split_queries:
+            self._as_background()
+            return sum(self._map_concurrently(lambda manager: manager.count(), self._get_split_managers()))
+
         self.method = 'GET'
         self.query.update({
             'include_count': True,
@@ -919,6 +1280,23 @@ class ObjectManager(IncrementMixin, ArrayOperationsMixin, Manager):
         response = self.request()
         return response['objects_count']
 
+    @clone
+    def exists(self):
+        """
+        Returns True if there is at least one object matching the lookup parameters.
+        Only the id of a single object is requested.
+
+        Usage::
+
+            Object.please.list(instance_name='raptor', class_name='some_class').filter(id__gt=600).exists()
+        """
+        if self._split_queries:
+            self._as_background()
+            return any(self._map_concurrently(lambda manager: manager.exists(), self._get_split_managers()))
+
+        self.query['fields'] = 'id'
+        return super(ObjectManager, self).exists()
+
     @clone
     def with_count(self, page_size=20):
         """
@@ -952,14 +1330,264 @@ class ObjectManager(IncrementMixin, ArrayOperationsMixin, Manager):
         Usage::
 
             objects = Object.please.list('instance-name', 'class-name').filter(henryk__gte='hello')
+
+        An ``__in`` lookup too long for a single url is split into many queries which are sent
+        concurrently; their results are merged by the ``order_by`` field (or id) and limited afterwards.
+        Other long queries are sent unchanged.
         """
 
         query = self._build_query(query_data=kwargs)
         self.query['query'] = json.dumps(query)
+        self._split_queries = self._split_query(query)
         self.method = 'GET'
         self.endpoint = 'list'
         return self
 
+    def _split_query(self, query):
+        if len(urlencode({'query': json.dumps(query)})) <= self.MAX_QUERY_LENGTH:
+            return None
+
+        # only an __in lookup can be split, other long queries are sent as they are;
+        in_lookups = [name for name, lookups in six.iteritems(query)
+                      if isinstance(lookups, dict) and isinstance(lookups.get('_in'), list)]
+        if not in_lookups:
+            return None
+
+        field_name = max(in_lookups, key=lambda name: len(query[name]['_in']))
+        values = query[field_name]['_in']
+        query[field_name]['_in'] = []
+        base_length = len(urlencode({'query': json.dumps(query)}))
+        separator_length = len(urlencode({'': ', '})) - 1
+        value_lengths = [len(urlencode({'': json.dumps(value)})) - 1 + separator_length for value in values]
+        if not value_lengths or base_length + max(value_lengths) > self.MAX_QUERY_LENGTH:
+            query[field_name]['_in'] = values
+            return None
+
+        chunks = [[]]
+        length = base_length
+        for value, value_length in zip(values, value_lengths):
+            if length + value_length > self.MAX_QUERY_LENGTH:
+                chunks.append([])
+                length = base_length
+            chunks[-1].append(value)
+            length += value_length
+
+        split_queries = []
+        for chunk in chunks:
+            query[field_name]['_in'] = chunk
+            split_queries.append(json.dumps(query))
+        query[field_name]['_in'] = values
+        return split_queries
+
+    def _get_split_managers(self):
+        managers = []
+        for query in self._split_queries:
+            manager = self._clone()
+            manager._split_queries = None
+            manager.query['query'] = query
+            managers.append(manager)
+        return managers
+
+    def iterator(self):
+        if not self._split_queries:
+            for obj in super(ObjectManager, self).iterator():
+                yield obj
+            return
+
+        def fetch(manager):
+            manager._serialize = False
+            manager._prefetch_related = []
+            return list(manager.iterator())
+
+        manager = self._clone()
+        manager._as_background()
+        objects = [obj for page in manager._map_concurrently(fetch, self._get_split_managers()) for obj in page]
+
+        order_by = self.query.get('order_by') or 'id'
+        field_name = order_by.lstrip('-')
+        objects.sort(key=lambda obj: (obj.get(field_name) is None, obj.get(field_name)),
+                     reverse=order_by.startswith('-'))
+
+        page = [self._track(self.serialize(obj)) for obj in objects[:self._limit or None]]
+        for obj in self._process_page(page):
+            yield obj
+
+    def _iter_raw_pages(self, prefetch=False):
+        if not self._split_queries:
+            for page in super(ObjectManager, self)._iter_raw_pages(prefetch=prefetch):
+                yield page
+            return
+
+        manager = self._clone()
+        manager._serialize = False
+        manager._prefetch_related = []
+        objects = list(manager.iterator())
+        if objects:
+            yield objects
+
+    @clone
+    def export(self, path_or_file, format='ndjson', fields=None, prefetch=True, progress=None):
+        """
+        Special method just for data object :class:`~syncano.models.base.Object` model.
+        Writes the objects to a file page by page; rows are encoded from the raw API responses,
+        so the memory usage does not depend on the number of objects.
+
+        Usage::
+
+            count = Object.please.list('instance-name', 'books').filter(year__gt=2000).export('books.ndjson')
+
+            def report(count, rate):
+                print('{0} objects, {1:.1f} objects/s'.format(count, rate))
+
+            Object.please.list('instance-name', 'books').export('books.csv', format='csv',
+                                                               fields=['id', 'title'], progress=report)
+
+        :param path_or_file: a path or a file-like object opened for writing (in text mode on python 3);
+        :param format: 'ndjson' (a JSON object per line) or 'csv';
+        :param fields: names of the exported fields; Default to all fields;
+        :param prefetch: request the next page while the current one is written; Default to True;
+        :param progress: a callable called after each page with the number of exported objects
+         and the objects per second;
+        :return: the number of exported objects;
+        """
+        self._as_background()
+        manager = self.fields(*fields) if fields else self
+        return ObjectExport(manager, format=format, fields=fields, prefetch=prefetch,
+                            progress=progress).process(path_or_file)
+
+    @clone
+    def import_file(self, path, format='ndjson', chunk=BaseBulkCreate.MAX_BATCH_SIZE, workers=None,
+                    checkpoint=None, reject=None, **kwargs):
+        """
+        Special method just for data object :class:`~syncano.models.base.Object` model.
+        Creates objects from a file read record by record; the records are validated with the model fields
+        and sent as concurrent batch requests.
+
+        Usage::
+
+            summary = Object.please.import_file('books.csv', format='csv', workers=8,
+                                                instance_name='instance-name', class_name='books')
+
+        After each round of requests the number of processed records is stored in the checkpoint file
+        (``<path>.checkpoint`` by default) and an interrupted import started again resumes from there;
+        remove the checkpoint file to import the file again. Records which failed validation, were
+        rejected by the API or were sent in a failed batch request are appended to the reject file
+        (``<path>.rejects`` by default) as JSON lines with the record offset, the record and the error;
+        other errors, e.g. an exceeded deadline, stop the import after the checkpoint of the round is stored.
+
+        :param path: a path of the file;
+        :param format: 'ndjson' (a JSON object per line) or 'csv' (with a header row; empty values are skipped);
+        :param chunk: the number of objects in a batch request, up to 50;
+        :param workers: the number of concurrent batch requests, adjusted by the concurrency governor by default;
+        :return: a dict with the 'created', 'rejected' and 'skipped' (by the checkpoint) counts;
+        """
+        self.properties.update(kwargs)
+        self._as_background()
+        return ObjectImport(self, format=format, chunk=chunk, workers=workers, checkpoint=checkpoint,
+                            reject=reject).process(path)
+
+    @clone
+    def aggregate(self, group_by=None, **aggregates):
+        """
+        Special method just for data object :class:`~syncano.models.base.Object` model.
+        Computes count, sum, avg, min and max of fields while streaming the objects page by page;
+        only the fields used by the aggregates are fetched and no models are built.
+        Pages are folded with NumPy when it is installed.
+
+        Usage::
+
+            Object.please.list('instance-name', 'orders').filter(paid__eq=True).aggregate(count=True, sum='price')
+            > {'count': 120, 'price__sum': 4200.0}
+
+            Object.please.list('instance-name', 'orders').aggregate(avg='price', max=['price', 'created'],
+                                                                    group_by='status')
+            > {'new': {'price__avg': 10.5, 'price__max': 99.0, 'created__max': '2016-01-01T10:00:00.000000Z'}, ...}
+
+        :param group_by: a field name; results are computed for each of its values;
+        :param aggregates: functions (count, sum, avg, min, max) with a field name or a list of field names;
+         ``count=True`` counts objects, ``count='field'`` counts objects with a value of the field;
+        :return: a dict with '<field>__<function>' (and 'count') keys, or a dict of such dicts by groups;
+        """
+        self._as_background()
+        aggregate = ObjectAggregate(self, aggregates, group_by=group_by)
+        aggregate.manager = self.fields(*aggregate.field_names)
+        aggregate.manager.query.setdefault('page_size', self.BULK_PAGE_SIZE)
+        return aggregate.process()
+
+    @clone
+    def changes_since(self, watermark=None, skew=None):
+        """
+        Special method just for data object :class:`~syncano.models.base.Object` model.
+        Iterates over the objects modified since the watermark, ordered by ``updated_at`` and id.
+
+        Usage::
+
+            changes = Object.please.list('instance-name', 'books').changes_since(watermark)
+            for book in changes:
+                invalidate(book)
+            watermark = changes.watermark  # store it for the next run
+
+        The watermark is a datetime (or its string) for the first run and later the JSON serializable
+        ``changes.watermark``, which moves together with the delivered objects. Objects sharing a timestamp
+        and objects saved up to ``skew`` seconds (5 by default) late are delivered exactly once.
+
+        :param watermark: None for all objects, a datetime or a watermark of the previous run;
+        :param skew: the tolerated clock skew in seconds;
+        :return: an iterable :class:`~syncano.models.changes.ChangeFeed` with the ``watermark`` attribute;
+        """
+        self.method = 'GET'
+        self.endpoint = 'list'
+        return ChangeFeed(self, watermark, skew=skew)
+
+    @clone
+    def to_local(self, hash_indexes=(), sorted_indexes=(), related=None):
+        """
+        Special method just for data object :class:`~syncano.models.base.Object` model.
+        Loads the objects into a :class:`~syncano.models.local.LocalStore` which evaluates
+        the same lookups as ``filter`` in memory, without requests.
+
+        Usage::
+
+            countries = Object.please.list('instance-name', 'countries').to_local(hash_indexes=['code'])
+            countries.filter(code__in=['PL', 'DE'])
+        """
+        from syncano.models.local import LocalStore  # avoid circular import;
+        return LocalStore(self.iterator(), hash_indexes=hash_indexes, sorted_indexes=sorted_indexes,
+                          related=related)
+
+    @clone
+    def replicate_to(self, sqlite_path, table=None, full=False, **kwargs):
+        """
+        Special method just for data object :class:`~syncano.models.base.Object` model.
+        Mirrors the objects of a class into a local SQLite table (named after the class by default).
+        The columns are taken from the class schema, fields with a filter or order index get an SQLite index.
+
+        Usage::
+
+            Object.please.list('instance-name', 'books').replicate_to('replica.sqlite')
+
+            # later, only objects updated since the previous sync are fetched:
+            Object.please.list('instance-name', 'books').replicate_to('replica.sqlite')
+
+        Objects removed in Syncano are not detected by the incremental sync, use ``full=True`` to rebuild the table.
+
+        :param sqlite_path: a path of the SQLite database;
+        :param table: the table name; Default to the class name;
+        :param full: remove all rows and fetch all objects again; Default to False;
+        :return: the number of fetched objects;
+        """
+        self.properties.update(kwargs)
+        self._as_background()
+        return ObjectReplica(self, sqlite_path, table=table).sync(full=full)
+
+    def _iterate_window(self, start, stop):
+        if not self._split_queries:
+            return super(ObjectManager, self)._iterate_window(start, stop)
+
+        if stop is not None:
+            self._limit = min(stop, self._limit) if self._limit else stop
+        return iter(list(self.iterator())[start:stop])
+
     def _build_query(self, query_data, **kwargs):
         query = {}
         self.properties.update(**kwargs)
@@ -1018,6 +1646,32 @@ class ObjectManager(IncrementMixin, ArrayOperationsMixin, Manager):
         else:
             return lookup, field_name
 
+    @clone
+    def delete(self, *args, **kwargs):
+        """
+        Removes single object based on provided arguments or, after ``filter``, all matching objects.
+        Matching objects are removed with concurrent batch requests; only their ids are fetched, page by page.
+
+        Usage::
+
+            Object.please.delete(instance_name='instance_a', class_name='some_class', id=10)
+
+            results = Object.please.list(instance_name='instance_a', class_name='some_class').filter(
+                year__lt=1900
+            ).delete()
+
+        :return: None for a single object; a dict with the raw batch response per id for the matching objects,
+         e.g.: {10: {'code': 204}, 11: {'code': 404, 'content': {'detail': 'Not found.'}}};
+        """
+        if args or 'id' in kwargs or not self.query.get('query'):
+            return super(ObjectManager, self).delete(*args, **kwargs)
+
+        self.properties.update(kwargs)
+        requests = self._get_matching_requests('DELETE', {})
+        if self.is_lazy:
+            return [batch_object for _, batch_object in requests]
+        return dict(self._send_matching_requests(requests))
+
     def bulk_create(self, *objects):
         """
         Creates many new objects.
@@ -1034,8 +1688,96 @@ class ObjectManager(IncrementMixin, ArrayOperationsMixin, Manager):
         """
         return ObjectBulkCreate(objects, self).process()
 
+    @clone
+    def bulk_upsert(self, objects, key='external_id', **kwargs):
+        """
+        Special method just for data object :class:`~syncano.models.base.Object` model.
+        Creates or updates many objects identified by the ``key`` field. Existing objects are found with
+        a single ``__in`` filter per chunk of 50 keys and the chunk is saved with one batch request.
+
+        Usage::
+
+            results = Object.please.bulk_upsert([
+                {'external_id': 'a-1', 'title': 'one'},
+                {'external_id': 'a-2', 'title': 'two'},
+            ], key='external_id', instance_name='instance_a', class_name='some_class')
+
+            for obj, created in results:
+                ...
+
+        Existing objects are updated with ``PATCH`` using only the provided fields.
+        The ``key`` field needs a filter index.
+
+        :param objects: a list of dicts with field values, each one containing the ``key`` field;
+        :param key: the name of the field which identifies objects;
+        :return: a list of (object, created) tuples in the order of the provided objects;
+         when an error occurs a plain dict is returned in place of the object;
+        """
+        self.properties.update(kwargs)
+        model = self.model.get_subclass_model(**self.properties)
+
+        keys = []
+        for data in objects:
+            if data.get(key) is None:
+                raise SyncanoValueError('Each object needs a value of the "{0}" field.'.format(key))
+            keys.append(data[key])
+
+        if len(set(keys)) != len(keys):
+            raise SyncanoValueError('Values of the "{0}" field need to be unique.'.format(key))
+
+        self._as_background()
+        results = []
+        for start in range(0, len(objects), BaseBulkCreate.MAX_BATCH_SIZE):
+            chunk = objects[start:start + BaseBulkCreate.MAX_BATCH_SIZE]
+            with self._slot():
+                existing = self._get_existing_ids(key, keys[start:start + BaseBulkCreate.MAX_BATCH_SIZE])
+                requests = [self._get_upsert_request(model, data, existing.get(data[key])) for data in chunk]
+                response = self.batch(*requests)
+            results.extend((obj, data[key] not in existing) for data, obj in zip(chunk, response))
+        return results
+
+    def _get_existing_ids(self, key, keys):
+        manager = self._clone()
+        manager.query = {}
+        manager = manager.list().filter(**{'{0}__in'.format(key): keys})
+        manager.query.update({'fields': 'id,{0}'.format(key), 'page_size': BaseBulkCreate.MAX_BATCH_SIZE})
+        manager._serialize = False
+        manager._limit = None
+        return {data[key]: data['id'] for data in manager.iterator()}
+
+    def _get_upsert_request(self, model, data, object_id):
+        properties = dict(self.properties, **data)
+        instance = model(**properties)
+        manager = self._clone()
+
+        if object_id is None:
+            manager.endpoint = 'list'
+            method = 'POST'
+            field_names = None
+        else:
+            manager.endpoint = 'detail'
+            manager.properties['id'] = object_id
+            method = 'PATCH'
+            field_names = set(data) - set(self.properties) - {'id'}
+
+        instance.validate(field_names=field_names)
+        body = instance.to_native(field_names=field_names)
+        path, defaults = manager._get_endpoint_properties()
+        return model.batch_object(method=method, path=path, body=body, properties=defaults)
+
+    def _iterate(self):
+        self._length_hint_pending = False
+        for obj in self.iterator():
+            yield obj
+
     def _get_response(self):
-        return self._initial_response or self.request()
+        response, self._counted_response = self._counted_response, None
+        if self._start_path:
+            return super(ObjectManager, self)._get_response()
+        return self._initial_response or response or self.request()
+
+    def _get_skip_query(self, page_size):
+        return {'page_size': page_size, 'fields': 'id'}
 
     def _get_instance(self, attrs):
         return self.model.get_subclass_model(**attrs)(**attrs)
@@ -1110,9 +1852,82 @@ class ObjectManager(IncrementMixin, ArrayOperationsMixin, Manager):
         self.query['order_by'] = field
         return self
 
+    @clone
+    def prefetch_related(self, *field_names):
+        """
+        Special method just for data object :class:`~syncano.models.base.Object` model.
+        Loads objects pointed by the reference and relation fields with one batch request per page of results
+        (up to 50 related objects per request) instead of one request per object.
+
+        Usage::
+
+            books = Object.please.list('instance-name', 'books').prefetch_related('author', 'tags')
+            for book in books:
+                author = book.get_prefetched('author')  # an object or None
+                tags = book.get_prefetched('tags')  # a list of objects
+        """
+        self._prefetch_related = self._prefetch_related + list(field_names)
+        self.method = 'GET'
+        self.endpoint = 'list'
+        return self
+
+    def _process_page(self, objects):
+        if not self._prefetch_related or not self._serialize:
+            return objects
+
+        schema = self.model.get_class_schema(**self.properties)
+        for field_name in self._prefetch_related:
+            self._prefetch_field(objects, schema, field_name)
+        return objects
+
+    def _prefetch_field(self, objects, schema, field_name):
+        try:
+            schema_field = schema[field_name]
+        except KeyError:
+            raise SyncanoValueError('Field "{0}" does not exist in class {1}.'.format(
+                field_name, self.properties.get('class_name')))
+
+        if schema_field['type'] not in ('reference', 'relation'):
+            raise SyncanoValueError('Prefetch supported only for reference and relation fields.')
+
+        is_relation = schema_field['type'] == 'relation'
+        related_ids = []
+        for obj in objects:
+            value = getattr(obj, field_name, None)
+            if value:
+                related_ids.extend(value if is_relation else [value])
+        related_ids = sorted(set(related_ids))
+
+        related_objects = self._get_related_objects(schema_field['target'], related_ids)
+
+        for obj in objects:
+            value = getattr(obj, field_name, None)
+            if is_relation:
+                prefetched = [related_objects[i] for i in value or [] if i in related_objects]
+            else:
+                prefetched = related_objects.get(value)
+            obj.set_prefetched(field_name, prefetched)
+
+    def _get_related_objects(self, target, related_ids):
+        instance_name = self.properties.get('instance_name') or registry.instance_name
+        if target == 'user':
+            manager = registry.User.please.list(instance_name=instance_name)
+        else:
+            manager = registry.Object.please.list(instance_name=instance_name, class_name=target)
+
+        related_objects = {}
+        for start in range(0, len(related_ids), BaseBulkCreate.MAX_BATCH_SIZE):
+            chunk = related_ids[start:start + BaseBulkCreate.MAX_BATCH_SIZE]
+            for related_id, related in six.iteritems(manager.in_bulk(chunk)):
+                if not isinstance(related, dict):
+                    related_objects[related_id] = related
+        return related_objects
+
     def _clone(self):
         manager = super(ObjectManager, self)._clone()
         manager._initial_response = self._initial_response
+        manager._prefetch_related = list(self._prefetch_related)
+        manager._split_queries = self._split_queries
         return manager
 
 
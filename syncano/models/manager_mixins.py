@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
+import threading
+import time
+from collections import OrderedDict
+
+import six
 from six import wraps
-from syncano.exceptions import SyncanoValueError
+from syncano.exceptions import IncrementBufferError, SyncanoValueError
+
+from .bulk import BaseBulkCreate
 
 
 def clone(func):
@@ -67,6 +74,28 @@ class IncrementMixin(object):
 
         return self.process(field_name, value, operation_type='decrement', **kwargs)
 
+    @clone
+    def increment_buffer(self, max_size=None, max_delay=None, **kwargs):
+        """
+        A manager method which returns a :class:`~syncano.models.manager_mixins.IncrementBuffer`;
+        it coalesces many increments into a few batch requests.
+
+        Usage::
+
+            counters = Object.please.increment_buffer(class_name='stats', max_delay=5)
+            counters.increment('views', 1, id=1715)
+            counters.increment('views', 1, id=1715)
+            counters.decrement('stock', 2, id=1715)
+            counters.flush()  # one PATCH: {'views': {'_increment': 2}, 'stock': {'_increment': -2}}
+
+        :param max_size: flush when that many objects have pending deltas; defaults to the batch size limit;
+        :param max_delay: flush when the oldest pending delta is older than that many seconds;
+        :param kwargs: class_name usually;
+        :return: the IncrementBuffer instance;
+        """
+        self.properties.update(kwargs)
+        return IncrementBuffer(self, max_size=max_size, max_delay=max_delay)
+
     def process(self, field_name, value, operation_type='increment', **kwargs):
         self.endpoint = 'detail'
         self.method = self.get_allowed_method('PATCH', 'PUT', 'POST')
@@ -88,15 +117,19 @@ class IncrementMixin(object):
 
     @classmethod
     def validate(cls, field_name, value, model, operation_type='increment'):
+        cls.validate_value(value, operation_type=operation_type)
+
+        if not cls._check_field_type_for_increment(model, field_name):
+            raise SyncanoValueError('{} works only on integer and float fields.'.format(operation_type.capitalize()))
+
+    @classmethod
+    def validate_value(cls, value, operation_type='increment'):
         if not isinstance(value, (int, float)):
             raise SyncanoValueError('Provide an integer or float as a {} value.'.format(operation_type))
 
         if not value >= 0:
             raise SyncanoValueError('Value should be positive.')
 
-        if not cls._check_field_type_for_increment(model, field_name):
-            raise SyncanoValueError('{} works only on integer and float fields.'.format(operation_type.capitalize()))
-
     @classmethod
     def _check_field_type_for_increment(cls, model, field_name):
         fields = {}
@@ -112,6 +145,145 @@ class IncrementMixin(object):
         return False
 
 
+class IncrementBuffer(object):
+    """
+    Accumulates increments in memory and sends them as batched PATCH ``_increment`` requests,
+    one request with merged deltas per object. Thread safe; it can be used as a context manager which
+    flushes on exit, also when the block raised. Thresholds are checked when a new delta is added,
+    no background thread is started.
+
+    Usage::
+
+        with Object.please.increment_buffer(class_name='stats', max_size=100) as counters:
+            for event in events:
+                counters.increment('views', 1, id=event.object_id)
+    """
+
+    def __init__(self, manager, max_size=None, max_delay=None):
+        self.manager = manager
+        self.max_size = max_size or BaseBulkCreate.MAX_BATCH_SIZE
+        self.max_delay = max_delay
+        self.deltas = OrderedDict()
+        self.buffered_at = None
+        self._validated = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def increment(self, field_name, value, **kwargs):
+        """
+        Adds value to the pending delta of the field.
+
+        :param field_name: the field name to increment;
+        :param value: the increment value;
+        :param kwargs: id usually;
+        """
+        self.add(field_name, value, 'increment', **kwargs)
+
+    def decrement(self, field_name, value, **kwargs):
+        """
+        Subtracts value from the pending delta of the field.
+
+        :param field_name: the field name to decrement;
+        :param value: the decrement value;
+        :param kwargs: id usually;
+        """
+        self.add(field_name, value, 'decrement', **kwargs)
+
+    def add(self, field_name, value, operation_type='increment', **kwargs):
+        properties = self.manager.properties.copy()
+        properties.update(kwargs)
+        key = tuple(sorted(six.iteritems(properties)))
+
+        self.manager.validate_value(value, operation_type=operation_type)
+        model_key = (tuple(item for item in key if item[0] != 'id'), field_name)
+        if model_key not in self._validated:
+            model = self.manager.model.get_subclass_model(**properties)
+            self.manager.validate(field_name, value, model, operation_type=operation_type)
+            self._validated.add(model_key)
+
+        delta = value if operation_type == 'increment' else -value
+
+        with self._lock:
+            if not self.deltas:
+                self.buffered_at = time.time()
+            fields = self.deltas.setdefault(key, {})
+            fields[field_name] = fields.get(field_name, 0) + delta
+            should_flush = self.should_flush()
+
+        if should_flush:
+            self.flush()
+
+    def should_flush(self):
+        if len(self.deltas) >= self.max_size:
+            return True
+        return self.max_delay is not None and time.time() - self.buffered_at >= self.max_delay
+
+    def flush(self):
+        """
+        Sends all pending deltas as chunked batch requests; when a batch request raises, the deltas
+        of it and of the following chunks are put back into the buffer and the error is raised.
+
+        :return: a list with the batch results (populated objects);
+        :raises: IncrementBufferError when some of the increments failed; the remaining ones are still applied.
+        """
+        with self._lock:
+            deltas, self.deltas = self.deltas, OrderedDict()
+
+        pending = []
+        for key, fields in six.iteritems(deltas):
+            body = {name: {'_increment': delta} for name, delta in six.iteritems(fields) if delta}
+            if not body:
+                continue
+
+            manager = self.manager._clone()
+            manager.properties.update(dict(key))
+            manager.endpoint = 'detail'
+            model = manager.model.get_subclass_model(**manager.properties)
+            path, defaults = manager._get_endpoint_properties()
+            pending.append((key, fields, model.batch_object(method='PATCH', path=path, body=body, properties=defaults)))
+
+        manager = self.manager._clone()
+        manager._as_background()
+        results = []
+        errors = []
+        for start in range(0, len(pending), BaseBulkCreate.MAX_BATCH_SIZE):
+            chunk = pending[start:start + BaseBulkCreate.MAX_BATCH_SIZE]
+            try:
+                with manager._slot():
+                    responses = manager.batch(*[request for _, _, request in chunk])
+            except Exception:
+                self._restore(pending[start:])
+                raise
+
+            for (key, fields, _), result in zip(chunk, responses):
+                if isinstance(result, dict):
+                    errors.append((dict(key), fields, result))
+                else:
+                    results.append(result)
+
+        if errors:
+            raise IncrementBufferError(errors)
+        return results
+
+    def _restore(self, pending):
+        # merged with the deltas added in the meantime;
+        with self._lock:
+            if not self.deltas:
+                self.buffered_at = time.time()
+            for key, fields, _ in pending:
+                buffered = self.deltas.setdefault(key, {})
+                for field_name, delta in six.iteritems(fields):
+                    buffered[field_name] = buffered.get(field_name, 0) + delta
+
+
 class ArrayOperationsMixin(object):
 
     @clone
@@ -264,3 +436,94 @@ class ArrayOperationsMixin(object):
 
         response = self.request()
         return response
+
+
+class RelationOperationsMixin(object):
+
+    @clone
+    def bulk_relate(self, field_name, relations, **kwargs):
+        """
+        A manager method that adds related objects to the relation field of many objects
+        using batch requests (up to 50 objects per request).
+
+        Usage::
+
+            results = Object.please.bulk_relate(
+                'followers',
+                {1: [10, 11], 2: [10]},
+                class_name='users_profiles'
+            )
+
+        :param field_name: the relation field name;
+        :param relations: a dict which maps object ids to the lists of related object ids (or objects);
+        :param kwargs: class_name usually;
+        :return: a dict in which keys are the object ids, and values are a populated objects;
+         When error occurs a plain dict is returned in that place;
+        """
+        self._as_background()
+        return self.relation_process(field_name, relations, operation_type='_add', **kwargs)
+
+    @clone
+    def bulk_unrelate(self, field_name, relations, **kwargs):
+        """
+        A manager method that removes related objects from the relation field of many objects
+        using batch requests (up to 50 objects per request).
+
+        Usage::
+
+            results = Object.please.bulk_unrelate(
+                'followers',
+                {1: [10, 11], 2: [10]},
+                class_name='users_profiles'
+            )
+
+        :param field_name: the relation field name;
+        :param relations: a dict which maps object ids to the lists of related object ids (or objects);
+        :param kwargs: class_name usually;
+        :return: a dict in which keys are the object ids, and values are a populated objects;
+         When error occurs a plain dict is returned in that place;
+        """
+        self._as_background()
+        return self.relation_process(field_name, relations, operation_type='_remove', **kwargs)
+
+    @classmethod
+    def relation_validate(cls, field_name, model):
+        fields = {field.name: field for field in model._meta.fields}
+        if field_name not in fields:
+            raise SyncanoValueError('Object has not specified field.')
+
+        from syncano.models import RelationField
+        if not isinstance(fields[field_name], RelationField):
+            raise SyncanoValueError('Field must be of relation type')
+
+        return fields[field_name]
+
+    def relation_process(self, field_name, relations, operation_type, **kwargs):
+        self.properties.update(kwargs)
+        model = self.model.get_subclass_model(**self.properties)
+        field = self.relation_validate(field_name, model)
+
+        object_ids = []
+        requests = []
+        for object_id, related in six.iteritems(relations):
+            related = field._make_list(related)
+            if not related:
+                continue
+
+            if field._check_relation_value(related):
+                related = [obj.id for obj in related]
+
+            manager = self._clone()
+            manager.properties['id'] = object_id
+            manager.endpoint = 'detail'
+            path, defaults = manager._get_endpoint_properties()
+
+            object_ids.append(object_id)
+            requests.append(model.batch_object(
+                method='PATCH',
+                path=path,
+                body={field_name: {operation_type: list(related)}},
+                properties=defaults
+            ))
+
+        return dict(zip(object_ids, self._batch_chunks(requests)))
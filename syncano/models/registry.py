@@ -1,21 +1,30 @@
 
 
 import re
+import threading
+from contextlib import contextmanager
 
 import six
 from syncano import logger
 
+from .session import IdentityMap, UnitOfWork
+
 
 class Registry(object):
     """Models registry.
     """
+    TEMPLATES_CACHE_SIZE = 1000
+
     def __init__(self, models=None):
         self.models = models or {}
         self.schemas = {}
         self.patterns = []
+        self.templates = []
+        self._templates_cache = {}
         self._pending_lookups = {}
         self.instance_name = None
         self._default_connection = None
+        self._local = threading.local()
 
     def __str__(self):
         return 'Registry: {0}'.format(', '.join(self.models))
@@ -27,29 +36,44 @@ class Registry(object):
         for name, model in six.iteritems(self.models):
             yield model
 
-    def get_model_patterns(self, cls):
+    def get_endpoint_patterns(self, cls):
         patterns = []
         for k, v in six.iteritems(cls._meta.endpoints):
             pattern = '^{0}$'.format(v['path'])
             for name in v.get('properties', []):
                 pattern = pattern.replace('{{{0}}}'.format(name), '([^/.]+)')
-            patterns.append((re.compile(pattern), cls))
+            patterns.append((re.compile(pattern), v['path']))
         return patterns
 
+    def get_model_patterns(self, cls):
+        return [(pattern, cls) for pattern, _ in self.get_endpoint_patterns(cls)]
+
     def get_model_by_path(self, path):
         for pattern, cls in self.patterns:
             if pattern.match(path):
                 return cls
         raise LookupError('Invalid path: {0}'.format(path))
 
+    def get_endpoint_template(self, path):
+        """Returns the endpoint path template matching the path, e.g. /v1.1/instances/{name}/; or the path itself."""
+        template = self._templates_cache.get(path)
+        if template is None:
+            template = next((template for pattern, template in self.templates if pattern.match(path)), path)
+            if len(self._templates_cache) >= self.TEMPLATES_CACHE_SIZE:
+                self._templates_cache.clear()
+            self._templates_cache[path] = template
+        return template
+
     def get_model_by_name(self, name):
         return self.models[name]
 
     def update(self, name, cls):
         self.models[name] = cls
         related_name = cls._meta.related_name
-        patterns = self.get_model_patterns(cls)
-        self.patterns.extend(patterns)
+        patterns = self.get_endpoint_patterns(cls)
+        self.patterns.extend((pattern, cls) for pattern, _ in patterns)
+        self.templates.extend(patterns)
+        self._templates_cache.clear()
 
         setattr(self, str(name), cls)
         setattr(self, str(related_name), cls.please.all())
@@ -107,4 +131,69 @@ class Registry(object):
             raise Exception('Set the default connection first.')
         return self._default_connection
 
+    @property
+    def identity_map(self):
+        return getattr(self._local, 'identity_map', None)
+
+    @contextmanager
+    def session(self):
+        """
+        Opens an identity map for the current thread: objects with the same model and pk returned
+        by different queries resolve to a single python instance, updated in place.
+        Nested sessions share the outermost identity map.
+
+        Usage::
+
+            with registry.session():
+                book = Object.please.get(class_name='books', id=10)
+                same_book = Object.please.in_bulk([10], class_name='books')[10]
+                assert book is same_book
+        """
+        previous = self.identity_map
+        identity_map = previous if previous is not None else IdentityMap()
+        self._local.identity_map = identity_map
+        try:
+            yield identity_map
+        finally:
+            self._local.identity_map = previous
+
+    @property
+    def pending_unit_of_work(self):
+        return getattr(self._local, 'unit_of_work', None)
+
+    @contextmanager
+    def unit_of_work(self, max_size=None, max_delay=None):
+        """
+        Queues ``Model.save`` and ``Model.delete`` calls made in the current thread and sends them
+        as batch requests on exit, see :class:`~syncano.models.session.UnitOfWork`.
+        Queued requests are discarded when the block raises. Nested blocks share the outermost queue.
+
+        Usage::
+
+            with registry.unit_of_work(max_size=50, max_delay=5):
+                for book in books:
+                    book.save()
+        """
+        previous = self.pending_unit_of_work
+        if previous is not None:
+            yield previous
+            return
+
+        unit_of_work = UnitOfWork(max_size=max_size, max_delay=max_delay)
+        self._local.unit_of_work = unit_of_work
+        try:
+            yield unit_of_work
+        except Exception:
+            unit_of_work.clear()
+            raise
+        finally:
+            self._local.unit_of_work = None
+        unit_of_work.flush()
+
+    def resolve_identity(self, instance):
+        identity_map = self.identity_map
+        if identity_map is None:
+            return instance
+        return identity_map.resolve(instance)
+
 registry = Registry()
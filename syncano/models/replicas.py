@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import json
+import sqlite3
+
+import six
+
+
+class ObjectReplica(object):
+    """
+    Helper class for mirroring data objects of a class into a SQLite table;
+
+    Usage:
+        count = ObjectReplica(manager, 'books.sqlite').sync()
+    """
+    META_TABLE = 'syncano_replicas'
+    PAGE_SIZE = 500
+
+    BASE_COLUMNS = [
+        ('id', 'INTEGER PRIMARY KEY'),
+        ('revision', 'INTEGER'),
+        ('created_at', 'TEXT'),
+        ('updated_at', 'TEXT'),
+    ]
+    COLUMN_TYPES = {
+        'integer': 'INTEGER',
+        'reference': 'INTEGER',
+        'boolean': 'INTEGER',
+        'float': 'REAL',
+    }
+
+    def __init__(self, manager, path, table=None):
+        self.manager = manager
+        self.path = path
+        self.table = table or manager.properties['class_name']
+
+    def sync(self, full=False):
+        schema = self.manager.model.get_class_schema(**self.manager.properties)
+        connection = sqlite3.connect(self.path)
+        try:
+            columns = self.create_table(connection, schema)
+            watermark = None
+            if full:
+                connection.execute('DELETE FROM {0}'.format(self.quote(self.table)))
+            else:
+                watermark = self.get_watermark(connection)
+
+            insert = 'INSERT OR REPLACE INTO {0} ({1}) VALUES ({2})'.format(
+                self.quote(self.table),
+                ', '.join(self.quote(name) for name in columns),
+                ', '.join('?' for _ in columns)
+            )
+
+            count = 0
+            newest = watermark
+            for page in self.get_manager(watermark)._iter_raw_pages(prefetch=True):
+                connection.executemany(insert, [[self.to_sql(obj.get(name)) for name in columns] for obj in page])
+                count += len(page)
+                updated = [obj['updated_at'] for obj in page if obj.get('updated_at')]
+                if newest:
+                    updated.append(newest)
+                newest = max(updated) if updated else None
+
+                # rows are fetched in the updated_at order, a row updated during the sync moves behind
+                # the watermark, so it can be stored with each page and an interrupted sync resumes from it;
+                if newest != watermark:
+                    self.set_watermark(connection, newest)
+                connection.commit()
+            connection.commit()
+            return count
+        finally:
+            connection.close()
+
+    def get_manager(self, watermark):
+        manager = self.manager._clone()
+        manager._serialize = False
+        manager.query['page_size'] = self.PAGE_SIZE
+        manager.query['order_by'] = 'updated_at'
+        if watermark:
+            # rows updated in the same moment as the newest synced one could be missed with _gt;
+            query = json.loads(manager.query.get('query') or '{}')
+            query.setdefault('updated_at', {})['_gte'] = watermark
+            manager.query['query'] = json.dumps(query)
+        return manager
+
+    def create_table(self, connection, schema):
+        columns = list(self.BASE_COLUMNS)
+        indexed = ['updated_at']
+        for field in schema:
+            columns.append((field['name'], self.COLUMN_TYPES.get(field['type'], 'TEXT')))
+            if field.get('filter_index') or field.get('order_index'):
+                indexed.append(field['name'])
+
+        connection.execute('CREATE TABLE IF NOT EXISTS {0} ({1})'.format(
+            self.quote(self.table),
+            ', '.join('{0} {1}'.format(self.quote(name), column_type) for name, column_type in columns)
+        ))
+
+        existing = set(row[1] for row in connection.execute('PRAGMA table_info({0})'.format(self.quote(self.table))))
+        for name, column_type in columns:
+            if name not in existing:
+                connection.execute('ALTER TABLE {0} ADD COLUMN {1} {2}'.format(
+                    self.quote(self.table), self.quote(name), column_type))
+
+        for name in indexed:
+            connection.execute('CREATE INDEX IF NOT EXISTS {0} ON {1} ({2})'.format(
+                self.quote('{0}_{1}_idx'.format(self.table, name)), self.quote(self.table), self.quote(name)))
+
+        connection.execute('CREATE TABLE IF NOT EXISTS {0} (table_name TEXT PRIMARY KEY, watermark TEXT)'.format(
+            self.META_TABLE))
+        return [name for name, _ in columns]
+
+    def get_watermark(self, connection):
+        row = connection.execute(
+            'SELECT watermark FROM {0} WHERE table_name = ?'.format(self.META_TABLE), [self.table]).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, connection, watermark):
+        connection.execute(
+            'INSERT OR REPLACE INTO {0} (table_name, watermark) VALUES (?, ?)'.format(self.META_TABLE),
+            [self.table, watermark]
+        )
+
+    @classmethod
+    def quote(cls, name):
+        return '"{0}"'.format(name.replace('"', '""'))
+
+    @classmethod
+    def to_sql(cls, value):
+        if isinstance(value, dict) and 'type' in value and 'value' in value:
+            value = value['value']  # references, files and dates;
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, bool):
+            return int(value)
+        if six.PY2 and isinstance(value, str):
+            return value.decode('utf-8')
+        return value
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import time
+
+import six
+from syncano.exceptions import UnitOfWorkError
+
+from .bulk import BaseBulkCreate
+
+
+class IdentityMap(object):
+    """
+    Keeps a single python instance per model and primary key;
+
+    Usage::
+
+        with registry.session() as identity_map:
+            book_a = Object.please.get(class_name='books', id=10)
+            book_b = Object.please.list(class_name='books').first()
+            # book_a is book_b when both have id 10;
+    """
+
+    def __init__(self):
+        self.objects = {}
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __contains__(self, instance):
+        return self.get_key(instance) in self.objects
+
+    @classmethod
+    def get_key(cls, instance):
+        if instance.pk is None:
+            return
+
+        properties = tuple(sorted(six.iteritems(instance.get_endpoint_data())))
+        return instance.__class__.__name__, instance.pk, properties
+
+    def resolve(self, instance):
+        """
+        Returns the instance already held by the map for the same model and pk; the held one
+        is updated in place with the fresh data, except for its unsaved local changes.
+        Unknown instances are registered and returned as they are.
+        """
+        from .archetypes import Model
+        if not isinstance(instance, Model):
+            return instance
+
+        key = self.get_key(instance)
+        if key is None:
+            return instance
+
+        existing = self.objects.get(key)
+        if existing is None:
+            self.objects[key] = instance
+            return instance
+
+        if existing is not instance:
+            dirty_fields = existing.get_dirty_fields() or set()
+            fresh_data = {name: value for name, value in six.iteritems(instance._raw_data)
+                          if name not in dirty_fields}
+            existing._raw_data.update(fresh_data)
+            existing.mark_clean(fresh_data)
+        return existing
+
+    def discard(self, instance):
+        self.objects.pop(self.get_key(instance), None)
+
+    def clear(self):
+        self.objects = {}
+
+
+class UnitOfWork(object):
+    """
+    Queues ``Model.save`` and ``Model.delete`` calls and sends them as batch requests;
+
+    Usage::
+
+        with registry.unit_of_work():
+            for book in books:
+                book.title = book.title.upper()
+                book.save()  # queued
+            old_book.delete()  # queued
+        # all queued requests were sent here in batches of 50;
+
+    The queue is flushed on exit and whenever ``max_size`` requests are queued or the oldest
+    queued request waits longer than ``max_delay`` seconds (checked when a new request is queued).
+    Responses are mapped back onto the queued instances.
+    """
+
+    def __init__(self, max_size=None, max_delay=None):
+        self.max_size = max_size or BaseBulkCreate.MAX_BATCH_SIZE
+        self.max_delay = max_delay
+        self.queue = []
+        self.queued_at = None
+
+    def __len__(self):
+        return len(self.queue)
+
+    def add(self, instance, batch_object):
+        """Queues a request built by ``Model.batch_object``; a pending save of the same instance is replaced."""
+        is_delete = batch_object['body']['method'] == 'DELETE'
+        if not is_delete:
+            self.queue = [(queued, request) for queued, request in self.queue
+                          if queued is not instance or request['body']['method'] == 'DELETE']
+
+        if not self.queue:
+            self.queued_at = time.time()
+        self.queue.append((instance, batch_object))
+
+        if self.should_flush():
+            self.flush()
+
+    def should_flush(self):
+        if len(self.queue) >= self.max_size:
+            return True
+        return self.max_delay is not None and time.time() - self.queued_at >= self.max_delay
+
+    def flush(self):
+        """
+        Sends all queued requests as chunked batch requests.
+
+        :raises: UnitOfWorkError when some of the requests failed; the remaining ones are still applied.
+        """
+        queue, self.queue = self.queue, []
+        if not queue:
+            return
+
+        manager = type(queue[0][0]).please
+        manager._as_background()
+        results = manager._batch_chunks([batch_object for _, batch_object in queue])
+
+        errors = []
+        for (instance, batch_object), result in zip(queue, results):
+            if not isinstance(result, dict):
+                if result is not instance:
+                    instance._raw_data.update(result._raw_data)
+                instance.mark_clean()
+            elif batch_object['body']['method'] == 'DELETE' and result.get('code') in (200, 204):
+                instance._clear_deleted()
+            else:
+                errors.append((instance, result))
+
+        if errors:
+            raise UnitOfWorkError(errors)
+
+    def clear(self):
+        self.queue = []
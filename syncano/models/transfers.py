@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+
+import requests
+import six
+from syncano.exceptions import SyncanoRequestError, SyncanoValueError
+
+from .bulk import BaseBulkCreate
+
+
+def open_file(path, mode='r'):
+    """Opens a file for the csv and json modules: in binary mode on python 2, as utf-8 text on python 3."""
+    if six.PY2:
+        return open(path, mode + 'b')
+    return io.open(path, mode, newline='', encoding='utf-8')
+
+
+class MalformedRecord(object):
+    """A line or a row of an imported file which could not be parsed; it is written to the rejects file."""
+
+    def __init__(self, data, error):
+        self.data = data
+        self.error = error
+
+
+class ObjectExport(object):
+    """
+    Helper class for streaming data objects to a file;
+
+    Usage:
+        count = ObjectExport(manager, format='csv', fields=['id', 'title']).process('books.csv')
+    """
+    FORMATS = ('ndjson', 'csv')
+
+    def __init__(self, manager, format='ndjson', fields=None, prefetch=True, progress=None):
+        if format not in self.FORMATS:
+            allowed = ', '.join(self.FORMATS)
+            raise SyncanoValueError('Unsupported format "{0}", allowed are {1}.'.format(format, allowed))
+
+        self.manager = manager
+        self.format = format
+        self.fields = list(fields) if fields else None
+        self.prefetch = prefetch
+        self.progress = progress
+
+    def process(self, path_or_file):
+        if isinstance(path_or_file, six.string_types):
+            with open_file(path_or_file, 'w') as output:
+                return self.write(output)
+        return self.write(path_or_file)
+
+    def write(self, output):
+        write_row = getattr(self, 'get_{0}_writer'.format(self.format))(output)
+        count = 0
+        started_at = time.time()
+
+        for page in self.manager._iter_raw_pages(prefetch=self.prefetch):
+            for row in page:
+                write_row(row)
+            count += len(page)
+
+            if self.progress:
+                elapsed = time.time() - started_at
+                self.progress(count, count / elapsed if elapsed else 0.0)
+
+        if self.format == 'csv' and not count and self.fields:
+            write_row(None)
+        return count
+
+    def get_ndjson_writer(self, output):
+        def write_row(row):
+            output.write(json.dumps(row) + '\n')
+        return write_row
+
+    def get_csv_writer(self, output):
+        writer = csv.writer(output)
+        columns = []
+
+        def write_row(row):
+            if not columns:
+                columns.extend(self.fields or sorted(row))
+                writer.writerow([self.to_csv(column) for column in columns])
+            if row is not None:
+                writer.writerow([self.to_csv(row.get(column)) for column in columns])
+        return write_row
+
+    @classmethod
+    def to_csv(cls, value):
+        if value is None:
+            return ''
+        if isinstance(value, (bool, dict, list)):
+            value = json.dumps(value)
+        if six.PY2 and isinstance(value, six.text_type):
+            return value.encode('utf-8')
+        return value
+
+
+class ObjectImport(object):
+    """
+    Helper class for streaming data objects from a file;
+
+    Usage:
+        summary = ObjectImport(manager, format='csv', workers=4).process('books.csv')
+    """
+    FORMATS = ObjectExport.FORMATS
+    # errors of batch requests which reject the records of the chunk, other errors stop the import;
+    REJECTED_ERRORS = (SyncanoRequestError, requests.RequestException)
+
+    def __init__(self, manager, format='ndjson', chunk=BaseBulkCreate.MAX_BATCH_SIZE, workers=None,
+                 checkpoint=None, reject=None):
+        if format not in self.FORMATS:
+            allowed = ', '.join(self.FORMATS)
+            raise SyncanoValueError('Unsupported format "{0}", allowed are {1}.'.format(format, allowed))
+
+        if not 0 < chunk <= BaseBulkCreate.MAX_BATCH_SIZE:
+            raise SyncanoValueError('Chunk size should be between 1 and {0}.'.format(BaseBulkCreate.MAX_BATCH_SIZE))
+
+        self.manager = manager
+        self.model = manager.model.get_subclass_model(**manager.properties)
+        self.format = format
+        self.chunk = chunk
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.reject = reject
+
+    def process(self, path):
+        checkpoint = self.checkpoint or '{0}.checkpoint'.format(path)
+        reject = self.reject or '{0}.rejects'.format(path)
+        offset = self.read_checkpoint(checkpoint)
+        summary = {'created': 0, 'rejected': 0, 'skipped': offset}
+
+        with open_file(path) as source:
+            records = islice(enumerate(getattr(self, 'read_{0}'.format(self.format))(source)), offset, None)
+            while True:
+                # without fixed workers the round follows the current limit of the governor;
+                workers = self.workers or self.manager.connection.governor.workers
+                records_round = list(islice(records, self.chunk * workers))
+                if not records_round:
+                    break
+
+                created, rejected, errors = self.send(records_round)
+                if rejected:
+                    self.write_rejected(reject, rejected)
+
+                summary['created'] += created
+                summary['rejected'] += len(rejected)
+                # the other chunks of the round were sent, a resumed import must not send them again;
+                self.write_checkpoint(checkpoint, records_round[-1][0] + 1)
+                fatal = [error for error in errors if not isinstance(error, self.REJECTED_ERRORS)]
+                if fatal:
+                    raise fatal[0]
+        return summary
+
+    def send(self, records):
+        """
+        Sends (offset, record) pairs as concurrent batch requests; returns the created count, rejected rows
+        and errors raised by batch requests, the records of a failed batch request are rejected with its error.
+        """
+        requests = []
+        rejected = []
+        for offset, record in records:
+            if isinstance(record, MalformedRecord):
+                rejected.append((offset, record.data, record.error))
+                continue
+
+            try:
+                requests.append((offset, record, self.manager._get_upsert_request(self.model, record, None)))
+            except (SyncanoValueError, ValueError) as e:
+                rejected.append((offset, record, str(e)))
+
+        chunks = [requests[start:start + self.chunk] for start in range(0, len(requests), self.chunk)]
+        responses = self.manager._map_concurrently(self.send_chunk, chunks, workers=self.workers)
+
+        created = 0
+        errors = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                errors.append(response)
+                rejected.extend((offset, record, str(response)) for offset, record, _ in chunk)
+                continue
+
+            for (offset, record, _), result in zip(chunk, response):
+                if isinstance(result, dict):
+                    rejected.append((offset, record, result))
+                else:
+                    created += 1
+        return created, sorted(rejected, key=lambda row: row[0]), errors
+
+    def send_chunk(self, chunk):
+        try:
+            return self.manager.batch(*[request for _, _, request in chunk])
+        except Exception as e:
+            return e  # the other chunks are still sent and checkpointed;
+
+    @classmethod
+    def read_ndjson(cls, source):
+        for line in source:
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield MalformedRecord(line.rstrip('\r\n'), str(e))
+                continue
+
+            if isinstance(record, dict):
+                yield record
+            else:
+                yield MalformedRecord(record, 'JSON object expected.')
+
+    @classmethod
+    def read_csv(cls, source):
+        reader = csv.DictReader(source)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # the reader goes on with the next line;
+                yield MalformedRecord(None, 'Line {0}: {1}'.format(reader.line_num, e))
+                continue
+
+            if None in row:
+                yield MalformedRecord(None, 'Line {0}: too many columns.'.format(reader.line_num))
+                continue
+
+            row = {key: value for key, value in six.iteritems(row) if value not in ('', None)}
+            if six.PY2:
+                try:
+                    row = {key.decode('utf-8'): value.decode('utf-8') for key, value in six.iteritems(row)}
+                except UnicodeDecodeError as e:
+                    yield MalformedRecord(None, 'Line {0}: {1}'.format(reader.line_num, e))
+                    continue
+            yield row
+
+    @classmethod
+    def read_checkpoint(cls, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path) as checkpoint:
+            return json.load(checkpoint)['offset']
+
+    @classmethod
+    def write_checkpoint(cls, path, offset):
+        temporary_path = '{0}.tmp'.format(path)
+        with open(temporary_path, 'w') as checkpoint:
+            json.dump({'offset': offset}, checkpoint)
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(temporary_path, path)
+
+    @classmethod
+    def write_rejected(cls, path, rejected):
+        with open(path, 'a') as output:
+            for offset, record, error in rejected:
+                output.write(json.dumps({'offset': offset, 'record': record, 'error': error}) + '\n')
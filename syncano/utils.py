@@ -1,14 +1,24 @@
 import datetime
+import heapq
 import re
+import threading
+import time
+from contextlib import contextmanager
 from decimal import Decimal
+from itertools import count
+from multiprocessing.pool import ThreadPool
 
 import six
 from slugify import slugify
+from syncano.exceptions import SyncanoDeadlineExceeded, SyncanoOperationCancelled
 
 PROTECTED_TYPES = six.integer_types + (
     type(None), float, Decimal, datetime.datetime,
     datetime.date, datetime.time)
 
+# The default number of threads used by the concurrent requests
+DEFAULT_WORKERS = 4
+
 
 def camelcase_to_underscore(text):
     """Converts camelcase text to underscore format."""
@@ -55,3 +65,287 @@ def force_text(s, encoding='utf-8', strings_only=False, errors='strict'):
         s = ' '.join(force_text(arg, encoding, strings_only, errors)
                      for arg in s)
     return s
+
+
+class ConcurrencyGovernor(object):
+    """
+    Adaptive (AIMD) limit of concurrent tasks of the parallel operations (batch fan-out, split queries,
+    bulk updates, imports and page prefetching) of a connection;
+
+    Usage:
+        with connection.governor.slot(priority=Connection.PRIORITY_BACKGROUND):
+            connection.request('POST', path, data=data)
+
+    Requests sent within a slot report their outcome to the governor. The limit grows by one after
+    a limit's worth of healthy responses and is halved on throttling (429), server errors, failed requests
+    and latency spikes of an endpoint, at most once per BACKOFF_INTERVAL seconds. Tasks waiting for
+    a free slot get it by priority (lower first) and in the order of arrival; requests sent outside
+    of slots, e.g. interactive ``get`` calls, never wait.
+    """
+    BACKOFF_FACTOR = 0.5
+    BACKOFF_INTERVAL = 1.0
+    LATENCY_FACTOR = 3.0
+    LATENCY_SAMPLES = 20
+    LATENCY_SMOOTHING = 0.1
+    MAX_LIMIT = 32
+
+    _local = threading.local()
+
+    def __init__(self, initial=DEFAULT_WORKERS, min_limit=1, max_limit=MAX_LIMIT):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.latencies = {}
+        self._backoff_at = None
+        self._waiting = []
+        self._tickets = count()
+        self._condition = threading.Condition()
+
+    @classmethod
+    def current(cls):
+        """Returns the governor of the slot held by the current thread or None."""
+        return getattr(cls._local, 'governor', None)
+
+    @property
+    def workers(self):
+        """The current number of allowed concurrent tasks."""
+        return int(self.limit)
+
+    @contextmanager
+    def slot(self, priority=0):
+        """Holds a slot while the block runs; requests sent in it report their outcome to this governor."""
+        if self.current() is self:
+            yield self  # the slot of the calling code, waiting for another one could deadlock;
+            return
+
+        self.acquire(priority, deadline=Deadline.current())
+        previous = self.current()
+        self._local.governor = self
+        try:
+            yield self
+        finally:
+            self._local.governor = previous
+            self.release()
+
+    def bind(self, function):
+        """Returns a function reporting the outcome of its requests to this governor, e.g. in another thread."""
+        def wrapped(*args, **kwargs):
+            previous = self.current()
+            self._local.governor = self
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._local.governor = previous
+        return wrapped
+
+    def wrap(self, function, priority=0):
+        """Returns a function holding a slot of this governor while it runs, e.g. in another thread."""
+        def wrapped(*args, **kwargs):
+            with self.slot(priority):
+                return function(*args, **kwargs)
+        return wrapped
+
+    def acquire(self, priority=0, deadline=None):
+        with self._condition:
+            ticket = (priority, next(self._tickets))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while self._waiting[0] != ticket or self.in_flight >= int(self.limit):
+                    if deadline is None:
+                        self._condition.wait()
+                        continue
+                    deadline.check()
+                    self._condition.wait(deadline.get_timeout(Deadline.POLL_INTERVAL))
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            self._condition.notify_all()  # the next waiting task can take another free slot;
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def report(self, status_code, latency=None, endpoint=None):
+        """Adjusts the limit to the outcome of a request; status_code is None when it has failed."""
+        with self._condition:
+            self.record(status_code, latency, endpoint)
+            self._condition.notify_all()
+
+    def record(self, status_code, latency=None, endpoint=None):
+        is_spike = False
+        if latency is not None:
+            # every endpoint has its own baseline, a slow batch request is not a spike of quick gets;
+            baseline = self.latencies.setdefault(endpoint, {'latency': latency, 'samples': 0})
+            is_spike = (baseline['samples'] >= self.LATENCY_SAMPLES and
+                        latency > baseline['latency'] * self.LATENCY_FACTOR)
+            baseline['samples'] += 1
+            baseline['latency'] += (latency - baseline['latency']) * self.LATENCY_SMOOTHING
+
+        is_server_error = isinstance(status_code, six.integer_types) and status_code >= 500
+        if status_code is None or status_code == 429 or is_server_error or is_spike:
+            self.back_off()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def back_off(self):
+        now = time.time()
+        if self._backoff_at is not None and now - self._backoff_at < self.BACKOFF_INTERVAL:
+            return  # responses of requests sent before the previous back off;
+        self._backoff_at = now
+        self.limit = max(self.min_limit, self.limit * self.BACKOFF_FACTOR)
+
+
+class CancellationToken(object):
+    """
+    Cancels the operations of a deadline from another thread;
+
+    Usage:
+        token = CancellationToken()
+        with syncano.deadline(token=token):
+            for obj in Object.please.list(class_name='books'):  # token.cancel() stops the scan
+                ...
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def is_cancelled(self):
+        return self._event.is_set()
+
+
+class Deadline(object):
+    """
+    Time limit (in seconds) and cancellation of all requests sent within it, also by concurrent operations;
+
+    Usage:
+        with Deadline(2.0):
+            Object.please.get(...)
+            Object.please.bulk_create(...)
+
+    Timeouts of requests are shrunk to the remaining time and nested deadlines never extend the outer one.
+    """
+    POLL_INTERVAL = 0.1
+
+    _local = threading.local()
+
+    def __init__(self, seconds=None, token=None):
+        self.expires_at = time.time() + seconds if seconds is not None else None
+        self.tokens = [token] if token is not None else []
+
+    def __enter__(self):
+        parent = self.current()
+        deadline = self.merge(parent) if parent is not None else self
+        self._stack().append(deadline)
+        return deadline
+
+    def __exit__(self, *args):
+        self._stack().pop()
+
+    @classmethod
+    def _stack(cls):
+        if not hasattr(cls._local, 'stack'):
+            cls._local.stack = []
+        return cls._local.stack
+
+    @classmethod
+    def current(cls):
+        """Returns the deadline of the current thread or None."""
+        stack = cls._stack()
+        return stack[-1] if stack else None
+
+    def merge(self, parent):
+        deadline = Deadline()
+        expires_at = [value for value in (self.expires_at, parent.expires_at) if value is not None]
+        deadline.expires_at = min(expires_at) if expires_at else None
+        deadline.tokens = parent.tokens + self.tokens
+        return deadline
+
+    def remaining(self):
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.time()
+
+    @property
+    def is_expired(self):
+        return self.expires_at is not None and self.expires_at <= time.time()
+
+    @property
+    def is_cancelled(self):
+        return any(token.is_cancelled for token in self.tokens)
+
+    def check(self):
+        if self.is_cancelled:
+            raise SyncanoOperationCancelled('Operation cancelled.')
+        if self.is_expired:
+            raise SyncanoDeadlineExceeded('Deadline exceeded.')
+
+    def get_timeout(self, timeout):
+        """Returns the timeout (a number or a (connect, read) tuple) shrunk to the remaining time."""
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise SyncanoDeadlineExceeded('Deadline exceeded.')
+        if isinstance(timeout, tuple):
+            return tuple(remaining if value is None else min(value, remaining) for value in timeout)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def sleep(self, seconds):
+        """Sleeps unless the deadline would pass in the meantime; wakes up regularly to check cancellation."""
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            raise SyncanoDeadlineExceeded('Deadline exceeded.')
+
+        wake_at = time.time() + seconds
+        while True:
+            self.check()
+            left = wake_at - time.time()
+            if left <= 0:
+                break
+            time.sleep(min(left, self.POLL_INTERVAL))
+
+    def wrap(self, function):
+        """Returns a function which runs within this deadline, e.g. in another thread."""
+        def wrapped(*args, **kwargs):
+            with self:
+                return function(*args, **kwargs)
+        return wrapped
+
+
+def map_concurrently(function, items, workers=None, governor=None, priority=0):
+    """
+    Calls function for every item using a pool of threads; results keep the order of items.
+    With a :class:`ConcurrencyGovernor` every call holds one of its slots and without workers the pool
+    can grow up to the governor's maximum.
+    """
+    items = list(items)
+    workers = min(workers or (governor.max_limit if governor is not None else DEFAULT_WORKERS), len(items))
+    if governor is not None and governor.current() is governor:
+        # called from a task holding a slot already, waiting for more slots could deadlock;
+        function = governor.bind(function)
+    elif governor is not None:
+        function = governor.wrap(function, priority)
+    deadline = Deadline.current()
+    if deadline is not None:
+        function = deadline.wrap(function)
+    if workers <= 1:
+        return [function(item) for item in items]
+
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(function, items)
+    finally:
+        pool.close()
+        pool.join()
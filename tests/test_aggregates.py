@@ -0,0 +1,81 @@
+import unittest
+
+from syncano.connection import Connection
+from syncano.exceptions import SyncanoValueError
+from syncano.models import Object, aggregates
+from syncano.models.aggregates import ObjectAggregate
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class ObjectAggregateTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = Object.please.using(Connection(api_key='key')).list(instance_name='test', class_name='orders')
+        self.pages = [
+            {'objects': [
+                {'id': 1, 'status': 'new', 'price': 10, 'created': {'type': 'datetime', 'value': '2016-01-02'}},
+                {'id': 2, 'status': 'paid', 'price': 5.5},
+                {'id': 3, 'status': 'new', 'price': None},
+            ], 'next': 'next_url'},
+            {'objects': [
+                {'id': 4, 'status': 'new', 'price': 20, 'created': {'type': 'datetime', 'value': '2016-01-01'}},
+            ], 'next': None},
+        ]
+
+    @mock.patch('syncano.models.manager.ObjectManager._get_model_field_names')
+    @mock.patch('syncano.models.manager.Manager.request')
+    def test_aggregate(self, request_mock, field_names_mock):
+        field_names_mock.return_value = ['id', 'status', 'price', 'created']
+        request_mock.side_effect = self.pages
+
+        results = self.manager.aggregate(count=True, sum='price', avg='price', min=['price', 'created'], max='price')
+
+        self.assertEqual(results, {
+            'count': 4,
+            'price__sum': 35.5,
+            'price__avg': 35.5 / 3,
+            'price__min': 5.5,
+            'price__max': 20,
+            'created__min': '2016-01-01',
+        })
+
+    @mock.patch('syncano.models.manager.ObjectManager._get_model_field_names')
+    @mock.patch('syncano.models.manager.Manager.request')
+    def test_group_by(self, request_mock, field_names_mock):
+        field_names_mock.return_value = ['id', 'status', 'price', 'created']
+        request_mock.side_effect = self.pages
+
+        with mock.patch('syncano.models.manager.ObjectManager.fields', autospec=True) as fields_mock:
+            fields_mock.side_effect = lambda manager, *args: manager
+            self.manager.aggregate(count='price', group_by='status')
+            self.assertEqual(fields_mock.call_args[0][1:], ('price', 'status'))
+
+        request_mock.side_effect = self.pages
+        results = self.manager.aggregate(count='price', sum='price', group_by='status')
+        self.assertEqual(results, {
+            'new': {'price__count': 2, 'price__sum': 30},
+            'paid': {'price__count': 1, 'price__sum': 5.5},
+        })
+
+    def test_python_and_numpy_folds(self):
+        for use_numpy in (False, True):
+            if use_numpy and aggregates.numpy is None:
+                continue
+            aggregate = ObjectAggregate(self.manager, {'sum': 'price', 'max': 'price'}, use_numpy=use_numpy)
+            state = aggregate.get_state()['price']
+            aggregate.fold(state, [1, None, 2.5], 'price')
+            aggregate.fold(state, [4], 'price')
+            self.assertEqual(state, {'count': 3, 'sum': 7.5, 'min': 1, 'max': 4})
+
+    def test_invalid(self):
+        with self.assertRaises(SyncanoValueError):
+            ObjectAggregate(self.manager, {'median': 'price'})
+        with self.assertRaises(SyncanoValueError):
+            ObjectAggregate(self.manager, {})
+        aggregate = ObjectAggregate(self.manager, {'sum': 'title'})
+        with self.assertRaises(SyncanoValueError):
+            aggregate.fold(aggregate.get_state()['title'], ['a'], 'title')
@@ -0,0 +1,55 @@
+import json
+import unittest
+from datetime import datetime
+
+from syncano.models import Object
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class ChangeFeedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = Object.please.list(instance_name='test', class_name='test')
+
+    def get_object(self, pk, updated_at):
+        return {'id': pk, 'updated_at': '2016-01-01T00:00:{0:02d}.000000Z'.format(updated_at)}
+
+    @mock.patch('syncano.models.manager.Manager.request', autospec=True)
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_changes(self, get_subclass_model_mock, request_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass('ChangeFeedTestObject', [])
+        queries = []
+
+        def request(manager, **kwargs):
+            queries.append(dict(manager.query))
+            return {'objects': objects, 'next': None}
+
+        request_mock.side_effect = request
+        objects = [self.get_object(3, 10), self.get_object(2, 20), self.get_object(1, 20)]
+
+        changes = self.manager.changes_since()
+        self.assertEqual([obj.id for obj in changes], [3, 1, 2])
+        self.assertEqual(queries[0]['order_by'], 'updated_at')
+        self.assertNotIn('query', queries[0])
+        self.assertEqual(changes.watermark, {
+            'updated_at': '2016-01-01T00:00:20.000000Z',
+            'seen': [[1, '2016-01-01T00:00:20.000000Z'], [2, '2016-01-01T00:00:20.000000Z']],
+        })
+
+        # a late object with an older timestamp and a new one sharing the watermark timestamp;
+        objects = [self.get_object(5, 17), self.get_object(1, 20), self.get_object(2, 20), self.get_object(4, 20)]
+        changes = self.manager.changes_since(json.loads(json.dumps(changes.watermark)))
+        self.assertEqual([obj.id for obj in changes], [5, 4])
+        self.assertEqual(json.loads(queries[1]['query']), {'updated_at': {'_gte': '2016-01-01T00:00:15.000000Z'}})
+        self.assertEqual(changes.watermark['updated_at'], '2016-01-01T00:00:20.000000Z')
+        self.assertEqual(len(changes.watermark['seen']), 4)
+
+        objects = [self.get_object(1, 40)]
+        changes = self.manager.changes_since(datetime(2016, 1, 1, 0, 0, 30), skew=0)
+        self.assertEqual([obj.id for obj in changes], [1])
+        self.assertEqual(json.loads(queries[2]['query']), {'updated_at': {'_gte': '2016-01-01T00:00:30.000000Z'}})
+        self.assertEqual(changes.watermark['seen'], [[1, '2016-01-01T00:00:40.000000Z']])
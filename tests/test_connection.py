@@ -1,12 +1,22 @@
 import json
 import tempfile
+import threading
+import time
 import unittest
 
+import requests
 import six
-from syncano import connect
-from syncano.connection import Connection, ConnectionMixin
-from syncano.exceptions import SyncanoRequestError, SyncanoValueError
+from syncano import connect, deadline
+from syncano.connection import CircuitBreaker, Connection, ConnectionMixin, ConnectionPool, HedgingPolicy, SingleFlight
+from syncano.exceptions import (
+    SyncanoCircuitOpenError,
+    SyncanoDeadlineExceeded,
+    SyncanoOperationCancelled,
+    SyncanoRequestError,
+    SyncanoValueError
+)
 from syncano.models.registry import registry
+from syncano.utils import CancellationToken, ConcurrencyGovernor, Deadline, map_concurrently
 
 if six.PY3:
     from urllib.parse import urljoin
@@ -391,6 +401,523 @@ class DefaultConnectionTestCase(unittest.TestCase):
         self.assertEqual(self.connection._connection, connection_mock)
         connection_mock.assert_called_once_with(a=1, b=2)
 
+    def test_custom_connection(self):
+        pool = ConnectionPool([Connection(api_key='a'), Connection(api_key='b')])
+        connection = self.connection.open(connection=pool)
+        self.assertEqual(connection, pool)
+        self.assertEqual(self.connection(), pool)
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.connections = [Connection(api_key=key) for key in ('a', 'b', 'c')]
+        for connection in self.connections:
+            connection.make_request = mock.MagicMock(return_value=connection.api_key)
+
+    def test_validation(self):
+        with self.assertRaises(SyncanoValueError):
+            ConnectionPool([])
+
+        with self.assertRaises(SyncanoValueError):
+            ConnectionPool([1, 2])
+
+        with self.assertRaises(SyncanoValueError):
+            ConnectionPool(self.connections, routing='random')
+
+    def test_round_robin(self):
+        pool = ConnectionPool(self.connections)
+        keys = [pool.request('GET', '/v1/instances/') for _ in range(4)]
+        self.assertEqual(keys, ['a', 'b', 'c', 'a'])
+        self.connections[0].make_request.assert_called_with('GET', '/v1/instances/')
+
+    def test_least_loaded(self):
+        pool = ConnectionPool(self.connections, routing=ConnectionPool.LEAST_LOADED)
+        pool.in_flight = [2, 0, 1]
+        self.assertEqual(pool.get_index('GET', '/v1/instances/'), 1)
+        pool.in_flight = [1, 1, 1]
+        self.assertEqual([pool.get_index('GET', '/v1/instances/') for _ in range(3)], [1, 2, 0])
+
+    def test_in_flight(self):
+        pool = ConnectionPool(self.connections)
+
+        def make_request(method_name, path, **kwargs):
+            self.assertEqual(pool.in_flight, [1, 0, 0])
+            raise SyncanoRequestError(500, 'Server error.')
+
+        self.connections[0].make_request.side_effect = make_request
+        with self.assertRaises(SyncanoRequestError):
+            pool.request('GET', '/v1/instances/')
+        self.assertEqual(pool.in_flight, [0, 0, 0])
+
+    def test_hash(self):
+        pool = ConnectionPool(self.connections, routing=ConnectionPool.HASH)
+        first = pool.request('GET', '/v1/instances/test/classes/')
+        self.assertEqual(pool.request('GET', '/v1/instances/test/classes/?last_pk=10'), first)
+        self.assertEqual(pool.make_request('GET', '/v1/instances/test/classes/'), first)
+
+        paths = ['/v1/instances/test/classes/{0}/'.format(index) for index in range(20)]
+        self.assertEqual(set(pool.request('GET', path) for path in paths), {'a', 'b', 'c'})
+
+        pool = ConnectionPool(self.connections, routing=ConnectionPool.HASH, key=lambda method_name, path: 'same')
+        self.assertEqual(set(pool.request('GET', path) for path in paths), {pool.request('GET', paths[0])})
+
+    def test_attributes(self):
+        pool = ConnectionPool(self.connections)
+        self.assertEqual(pool.api_key, 'a')
+        self.assertEqual(pool.host, self.connections[0].host)
+        self.assertTrue(pool.is_authenticated())
+        self.assertEqual(pool.authenticate(), ['a', 'b', 'c'])
+
+
+class ConcurrencyGovernorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.governor = ConcurrencyGovernor(initial=4, max_limit=6)
+
+    def test_additive_increase(self):
+        for _ in range(5):
+            self.governor.record(200, 0.1)
+        self.assertEqual(self.governor.workers, 5)
+
+        for _ in range(100):
+            self.governor.record(200, 0.1)
+        self.assertEqual(self.governor.workers, 6)
+
+    @mock.patch('syncano.utils.time.time')
+    def test_multiplicative_decrease(self, time_mock):
+        time_mock.return_value = 100.0
+        self.governor.record(429, 0.1)
+        self.assertEqual(self.governor.workers, 2)
+
+        self.governor.record(500, 0.1)
+        self.assertEqual(self.governor.workers, 2)  # within the back off interval;
+
+        time_mock.return_value = 102.0
+        self.governor.record(None, 0.1)
+        self.assertEqual(self.governor.workers, 1)
+
+        time_mock.return_value = 104.0
+        self.governor.record(503, 0.1)
+        self.assertEqual(self.governor.workers, 1)
+
+    def test_latency_spike(self):
+        governor = ConcurrencyGovernor(initial=4, max_limit=32)
+        for _ in range(ConcurrencyGovernor.LATENCY_SAMPLES):
+            governor.record(200, 0.1)
+        limit = governor.limit
+
+        governor.record(200, 0.2)
+        self.assertGreater(governor.limit, limit)
+
+        governor.record(200, 1.0)
+        self.assertLess(governor.limit, limit)
+
+    def test_acquire(self):
+        governor = ConcurrencyGovernor(initial=1)
+        governor.acquire()
+        acquired = threading.Event()
+
+        def acquire():
+            governor.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+
+        governor.release()
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+        self.assertEqual(governor.in_flight, 1)
+
+    def test_priority(self):
+        governor = ConcurrencyGovernor(initial=1)
+        governor.acquire()
+        order = []
+
+        def acquire(name, priority):
+            governor.acquire(priority)
+            order.append(name)
+            governor.release()
+
+        threads = []
+        for name, priority in [('background', 10), ('interactive', 0), ('second background', 10)]:
+            thread = threading.Thread(target=acquire, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            while len(governor._waiting) < len(threads):
+                time.sleep(0.001)
+
+        governor.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ['interactive', 'background', 'second background'])
+
+    def test_map_concurrently(self):
+        governor = ConcurrencyGovernor(initial=2)
+        lock = threading.Lock()
+        peak = []
+
+        def task(item):
+            with lock:
+                peak.append(governor.in_flight)
+            time.sleep(0.01)
+            return item * 2
+
+        self.assertEqual(map_concurrently(task, range(8), governor=governor), list(range(0, 16, 2)))
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(governor.in_flight, 0)
+
+    def test_nested_slot(self):
+        governor = ConcurrencyGovernor(initial=1)
+        with governor.slot():
+            with governor.slot(priority=10):
+                self.assertEqual(governor.in_flight, 1)
+            self.assertIs(ConcurrencyGovernor.current(), governor)
+        self.assertIsNone(ConcurrencyGovernor.current())
+        self.assertEqual(governor.in_flight, 0)
+
+    def test_nested_map_concurrently(self):
+        governor = ConcurrencyGovernor(initial=1)
+
+        def task(item):
+            return sum(map_concurrently(lambda value: value, [item, item], governor=governor))
+
+        self.assertEqual(map_concurrently(task, [1, 2], governor=governor), [2, 4])
+
+    @mock.patch('requests.Session.get')
+    def test_connection_signals(self, get_mock):
+        connection = Connection(api_key='key', governor=self.governor)
+        get_mock.return_value = mock.MagicMock(status_code=500, headers={})
+
+        with self.assertRaises(SyncanoRequestError):
+            connection.make_request('GET', 'test')
+        self.assertEqual(self.governor.workers, 4)  # single requests are not governed;
+
+        with self.governor.slot():
+            with self.assertRaises(SyncanoRequestError):
+                connection.make_request('GET', 'test')
+        self.assertEqual(self.governor.workers, 2)
+        self.assertEqual(self.governor.in_flight, 0)
+
+        get_mock.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            with self.governor.slot():
+                connection.make_request('GET', 'test')
+        self.assertEqual(self.governor.in_flight, 0)
+
+    @mock.patch('requests.Session.get')
+    def test_single_requests(self, get_mock):
+        connection = Connection(api_key='key')
+        self.assertIsNot(connection.governor, Connection(api_key='key').governor)
+        lock = threading.Lock()
+        released = threading.Event()
+        in_flight = []
+
+        def get(*args, **kwargs):
+            with lock:
+                in_flight.append(None)
+            released.wait(1)
+            return mock.MagicMock(status_code=200, headers={})
+
+        get_mock.side_effect = get
+        threads = [threading.Thread(target=connection.make_request, args=('GET', 'test/{0}'.format(i)))
+                   for i in range(connection.governor.workers * 2)]
+        for thread in threads:
+            thread.start()
+        while len(in_flight) < len(threads):
+            time.sleep(0.001)
+        released.set()
+        for thread in threads:
+            thread.join()
+
+    def test_pool_governor(self):
+        pool = ConnectionPool([Connection(api_key='first'), Connection(api_key='second')])
+        self.assertEqual(pool.governor.workers, ConcurrencyGovernor().workers * 2)
+
+
+class DeadlineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = Connection(api_key='key', governor=ConcurrencyGovernor())
+
+    def test_nested(self):
+        self.assertIsNone(Deadline.current())
+        with deadline(10) as outer:
+            self.assertEqual(Deadline.current(), outer)
+            with Deadline(100) as inner:
+                self.assertEqual(inner.expires_at, outer.expires_at)
+            with Deadline(1) as inner:
+                self.assertLess(inner.expires_at, outer.expires_at)
+            self.assertEqual(Deadline.current(), outer)
+        self.assertIsNone(Deadline.current())
+
+    def test_get_timeout(self):
+        current = Deadline(1)
+        self.assertLessEqual(current.get_timeout(30), 1)
+        self.assertLessEqual(current.get_timeout(None), 1)
+        self.assertEqual(current.get_timeout((0.5, None))[0], 0.5)
+        self.assertEqual(Deadline().get_timeout(30), 30)
+
+        with self.assertRaises(SyncanoDeadlineExceeded):
+            Deadline(-1).get_timeout(30)
+
+    def test_concurrent_operations(self):
+        with deadline(5) as current:
+            expires_at = map_concurrently(lambda _: Deadline.current().expires_at, range(3), workers=3)
+        self.assertEqual(expires_at, [current.expires_at] * 3)
+
+    @mock.patch('requests.Session.get')
+    def test_request_timeout(self, get_mock):
+        get_mock.return_value = mock.MagicMock(status_code=200, headers={})
+        with deadline(1):
+            self.connection.make_request('GET', 'test')
+        self.assertLessEqual(get_mock.call_args[1]['timeout'], 1)
+
+        def timeout(*args, **kwargs):
+            Deadline.current().expires_at = time.time()
+            raise requests.Timeout()
+
+        get_mock.side_effect = timeout
+        with self.assertRaises(SyncanoDeadlineExceeded):
+            with deadline(1):
+                self.connection.make_request('GET', 'test')
+
+        get_mock.side_effect = requests.Timeout
+        with self.assertRaises(requests.Timeout):
+            with deadline(10):
+                self.connection.make_request('GET', 'test')
+
+    @mock.patch('requests.Session.get')
+    def test_throttling(self, get_mock):
+        get_mock.return_value = mock.MagicMock(status_code=429, headers={'retry-after': 5})
+        with self.assertRaises(SyncanoDeadlineExceeded):
+            with deadline(1):
+                self.connection.make_request('GET', 'test')
+        self.assertEqual(get_mock.call_count, 1)
+
+    @mock.patch('requests.Session.get')
+    def test_cancellation(self, get_mock):
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(SyncanoOperationCancelled):
+            with deadline(token=token):
+                self.connection.make_request('GET', 'test')
+        self.assertFalse(get_mock.called)
+
+    def test_cancel_waiting_request(self):
+        governor = ConcurrencyGovernor(initial=1)
+        governor.acquire()
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+
+        with self.assertRaises(SyncanoOperationCancelled):
+            governor.acquire(deadline=Deadline(token=token))
+        self.assertEqual(governor._waiting, [])
+
+
+class HedgingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.hedging = HedgingPolicy(percentile=90, budget=0.5)
+        self.connection = Connection(api_key='key', governor=None, hedging=self.hedging)
+
+    def test_policy(self):
+        self.assertIsNone(self.hedging.get_delay())
+        for latency in range(1, 21):
+            self.hedging.record(latency / 100.0)
+        self.assertEqual(self.hedging.get_delay(), 0.18)
+
+        self.assertTrue(self.hedging.allow_hedge())
+        self.assertFalse(self.hedging.allow_hedge())  # 2 requests, budget for 1 hedge;
+
+        with self.assertRaises(SyncanoValueError):
+            HedgingPolicy(percentile=0)
+
+    @mock.patch('syncano.connection.Connection.send')
+    def test_hedged_request(self, send_mock):
+        self.hedging.budget = 1
+        for _ in range(HedgingPolicy.MIN_SAMPLES):
+            self.hedging.record(0.01)
+        released = threading.Event()
+        responses = [
+            lambda: released.wait(1) and mock.MagicMock(status_code=200, json=lambda: 'slow'),
+            lambda: mock.MagicMock(status_code=200, json=lambda: 'fast'),
+        ]
+        send_mock.side_effect = lambda *args: responses.pop(0)()
+
+        self.assertEqual(self.connection.make_request('GET', 'test'), 'fast')
+        self.assertEqual(send_mock.call_count, 2)
+        self.assertEqual(self.hedging.hedges, 1)
+        released.set()
+
+        # POST requests are never duplicated;
+        send_mock.side_effect = lambda *args: mock.MagicMock(status_code=200, json=lambda: 'ok')
+        self.connection.make_request('POST', 'test')
+        self.assertEqual(send_mock.call_count, 3)
+
+    @mock.patch('syncano.connection.Connection.send')
+    def test_budget(self, send_mock):
+        for _ in range(HedgingPolicy.MIN_SAMPLES):
+            self.hedging.record(0.01)
+        self.hedging.budget = 0
+        send_mock.side_effect = lambda *args: time.sleep(0.05) or mock.MagicMock(status_code=200, json=lambda: 'ok')
+
+        self.assertEqual(self.connection.make_request('GET', 'test'), 'ok')
+        self.assertEqual(send_mock.call_count, 1)
+
+    @mock.patch('syncano.connection.Connection.send')
+    def test_failed_attempt(self, send_mock):
+        for _ in range(HedgingPolicy.MIN_SAMPLES):
+            self.hedging.record(0.01)
+        send_mock.side_effect = requests.ConnectionError
+        with self.assertRaises(requests.ConnectionError):
+            self.connection.make_request('GET', 'test')
+        self.assertEqual(len(self.hedging.latencies), HedgingPolicy.MIN_SAMPLES)
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = Connection(api_key='key', governor=None, single_flight=True)
+        self.released = threading.Event()
+        self.calls = []
+
+    def send(self, method, url, params):
+        self.calls.append(params['headers'].get('Authorization'))
+        self.released.wait(1)
+        return mock.MagicMock(status_code=200, json=lambda: {'name': 'test'})
+
+    def get_pending(self):
+        flights = list(self.connection.flights._flights.values())
+        return len(flights) + sum(flight['waiters'] for flight in flights)
+
+    def run_concurrently(self, *requests):
+        results = [None] * len(requests)
+
+        def run(index, request):
+            results[index] = request()
+
+        threads = [threading.Thread(target=run, args=item) for item in enumerate(requests)]
+        for thread in threads:
+            thread.start()
+        while self.get_pending() < len(requests):
+            time.sleep(0.001)
+        self.released.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @mock.patch('syncano.connection.Connection.send')
+    def test_coalescing(self, send_mock):
+        send_mock.side_effect = self.send
+        results = self.run_concurrently(*[lambda: self.connection.make_request('GET', 'test')] * 3)
+
+        self.assertEqual(send_mock.call_count, 1)
+        self.assertEqual(results, [{'name': 'test'}] * 3)
+        self.assertEqual(len(set(id(result) for result in results)), 3)
+        self.assertEqual(self.connection.flights._flights, {})
+
+    @mock.patch('syncano.connection.Connection.send')
+    def test_different_requests(self, send_mock):
+        send_mock.side_effect = self.send
+        other = Connection(api_key='other', governor=None)
+        other.flights = self.connection.flights
+        self.run_concurrently(
+            lambda: self.connection.make_request('GET', 'test'),
+            lambda: self.connection.make_request('GET', 'test', params={'page_size': 10}),
+            lambda: other.make_request('GET', 'test'),
+        )
+        self.assertEqual(send_mock.call_count, 3)
+        self.assertEqual(sorted(self.calls), ['token key', 'token key', 'token other'])
+
+    def test_error(self):
+        flights = SingleFlight()
+        with self.assertRaises(SyncanoValueError):
+            flights.do('key', mock.Mock(side_effect=SyncanoValueError('error')))
+        self.assertEqual(flights.do('key', lambda: 1), 1)
+
+    @mock.patch('requests.Session.get')
+    def test_disabled(self, get_mock):
+        connection = Connection(api_key='key', governor=None)
+        get_mock.return_value = mock.MagicMock(status_code=200, headers={})
+        connection.make_request('GET', 'test')
+        self.assertIsNone(connection.flights)
+        self.assertTrue(get_mock.called)
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(threshold=3, reset_timeout=10)
+        self.connection = Connection(api_key='key', governor=None, single_flight=False, circuit_breaker=self.breaker)
+        self.objects = '/v1.1/instances/test/classes/books/objects/'
+        self.template = '/v1.1/instances/{instance_name}/classes/{class_name}/objects/'
+
+    @mock.patch('syncano.connection.time.time')
+    def test_states(self, time_mock):
+        time_mock.return_value = 100.0
+        for _ in range(2):
+            self.breaker.after('endpoint', False)
+        self.breaker.after('endpoint', True)
+        self.breaker.after('endpoint', False)
+        self.assertEqual(self.breaker.get_state('endpoint'), CircuitBreaker.CLOSED)
+
+        for _ in range(2):
+            self.breaker.after('endpoint', False)
+        self.assertEqual(self.breaker.get_state('endpoint'), CircuitBreaker.OPEN)
+        with self.assertRaises(SyncanoCircuitOpenError):
+            self.breaker.before('endpoint')
+        self.breaker.before('other')
+
+        time_mock.return_value = 110.0
+        self.breaker.before('endpoint')
+        self.assertEqual(self.breaker.get_state('endpoint'), CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(SyncanoCircuitOpenError):
+            self.breaker.before('endpoint')  # only one probe;
+
+        self.breaker.after('endpoint', False)
+        self.assertEqual(self.breaker.get_state('endpoint'), CircuitBreaker.OPEN)
+
+        time_mock.return_value = 120.0
+        self.breaker.before('endpoint')
+        self.breaker.after('endpoint', None)  # the probe was not sent;
+        self.breaker.before('endpoint')
+        self.breaker.after('endpoint', True)
+        self.assertEqual(self.breaker.get_state('endpoint'), CircuitBreaker.CLOSED)
+
+    @mock.patch('requests.Session.get')
+    def test_connection(self, get_mock):
+        get_mock.return_value = mock.MagicMock(status_code=500, headers={})
+        for _ in range(3):
+            with self.assertRaises(SyncanoRequestError):
+                self.connection.make_request('GET', self.objects)
+        self.assertEqual(self.breaker.get_state(self.template), CircuitBreaker.OPEN)
+
+        with self.assertRaises(SyncanoCircuitOpenError) as context:
+            self.connection.make_request('GET', self.objects + '?page_size=10')
+        self.assertEqual(context.exception.endpoint, self.template)
+        self.assertIsInstance(context.exception, SyncanoRequestError)
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(get_mock.call_count, 3)
+
+        get_mock.return_value = mock.MagicMock(status_code=404, headers={})
+        for _ in range(3):
+            with self.assertRaises(SyncanoRequestError):
+                self.connection.make_request('GET', '/v1.1/instances/test/classes/books/')
+        self.assertEqual(self.breaker.get_state('/v1.1/instances/{instance_name}/classes/{name}/'),
+                         CircuitBreaker.CLOSED)
+
+    @mock.patch('requests.Session.get')
+    def test_timeouts(self, get_mock):
+        get_mock.side_effect = requests.Timeout
+        for _ in range(3):
+            with self.assertRaises(requests.Timeout):
+                self.connection.make_request('GET', self.objects)
+        with self.assertRaises(SyncanoCircuitOpenError):
+            self.connection.make_request('GET', self.objects)
+
 
 class ConnectionMixinTestCase(unittest.TestCase):
 
@@ -412,6 +939,10 @@ class ConnectionMixinTestCase(unittest.TestCase):
         self.mixin.connection = connection
         self.assertEqual(self.mixin._connection, connection)
 
+        pool = ConnectionPool([connection])
+        self.mixin.connection = pool
+        self.assertEqual(self.mixin._connection, pool)
+
     def test_setter_validation(self):
         self.assertEqual(self.mixin._connection, None)
         with self.assertRaises(SyncanoValueError):
@@ -0,0 +1,100 @@
+import unittest
+from datetime import datetime
+
+from syncano.exceptions import SyncanoValueError
+from syncano.models import Object
+from syncano.models.geo import Distance, GeoPoint
+from syncano.models.local import LocalStore
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class LocalStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.objects = [
+            {'id': 1, 'name': 'Poland', 'code': 'PL', 'population': 38, 'tags': ['eu', 'nato'],
+             'capital': {'latitude': 52.23, 'longitude': 21.01}, 'updated_at': '2016-01-02T00:00:00.000000Z',
+             'continent': {'type': 'reference', 'target': 'continents', 'value': 10}},
+            {'id': 2, 'name': 'Germany', 'code': 'DE', 'population': 83, 'tags': ['eu'],
+             'capital': {'latitude': 52.52, 'longitude': 13.40}, 'updated_at': '2016-01-01T00:00:00.000000Z',
+             'continent': {'type': 'reference', 'target': 'continents', 'value': 10}},
+            {'id': 3, 'name': 'Portugal', 'code': 'PT', 'population': None, 'tags': ['eu', 'nato']},
+            {'id': 4, 'name': 'Peru', 'code': 'PE', 'population': 33, 'continent': 11},
+        ]
+        self.continents = LocalStore([{'id': 10, 'name': 'Europe'}, {'id': 11, 'name': 'South America'}])
+
+    def get_ids(self, objects):
+        return [obj['id'] for obj in objects]
+
+    def assert_same_results(self, lookups, expected):
+        plain = LocalStore(self.objects, related={'continent': self.continents})
+        indexed = LocalStore(self.objects, hash_indexes=['code', 'tags'], sorted_indexes=['population', 'name'],
+                             related={'continent': self.continents})
+        self.assertEqual(self.get_ids(plain.filter(**lookups)), expected)
+        self.assertEqual(self.get_ids(indexed.filter(**lookups)), expected)
+
+    def test_lookups(self):
+        self.assert_same_results({'code': 'PL'}, [1])
+        self.assert_same_results({'code__eq': 'PL'}, [1])
+        self.assert_same_results({'code__neq': 'PL'}, [2, 3, 4])
+        self.assert_same_results({'code__in': ['PL', 'DE', 'XX']}, [1, 2])
+        self.assert_same_results({'population__gt': 33}, [1, 2])
+        self.assert_same_results({'population__gte': 33}, [1, 2, 4])
+        self.assert_same_results({'population__lt': 38}, [4])
+        self.assert_same_results({'population__lte': 38, 'code__in': ['PL', 'PE']}, [1, 4])
+        self.assert_same_results({'population__exists': False}, [3])
+        self.assert_same_results({'name__startswith': 'Po'}, [1, 3])
+        self.assert_same_results({'name__istartswith': 'po'}, [1, 3])
+        self.assert_same_results({'name__endswith': 'al'}, [3])
+        self.assert_same_results({'name__iendswith': 'ND'}, [1])
+        self.assert_same_results({'name__icontains': 'ER'}, [2, 4])
+        self.assert_same_results({'name__ieq': 'peru'}, [4])
+        self.assert_same_results({'name__contains': 'er'}, [2, 4])
+        self.assert_same_results({'tags__contains': ['eu', 'nato']}, [1, 3])
+        self.assert_same_results({'updated_at__gt': datetime(2016, 1, 1, 12)}, [1])
+        self.assert_same_results({'capital__near': (GeoPoint(52.0, 21.0), Distance(kilometers=30))}, [1])
+        self.assert_same_results({'capital__near': {'latitude': 52.0, 'longitude': 21.0, 'miles': 400}}, [1, 2])
+        self.assert_same_results({'continent__name__eq': 'Europe'}, [1, 2])
+        self.assert_same_results({'continent__name__startswith': 'South'}, [4])
+
+    def test_query(self):
+        store = LocalStore(self.objects, sorted_indexes=['population'])
+        results = store.query({'population__exists': True}, order_by='-population', limit=2)
+        self.assertEqual(self.get_ids(results), [2, 1])
+        self.assertEqual(self.get_ids(store.query({}, order_by='population')), [4, 1, 2, 3])
+
+    def test_invalid_lookups(self):
+        store = LocalStore(self.objects)
+        with self.assertRaises(SyncanoValueError):
+            store.filter(name__like='P')
+        with self.assertRaises(SyncanoValueError):
+            store.filter(continent__name__eq='Europe')
+        with self.assertRaises(SyncanoValueError):
+            store.filter(continent__is=10)
+
+    def test_allowed_lookups(self):
+        store = LocalStore(self.objects)
+        for lookup in Object.please.ALLOWED_LOOKUPS:
+            if lookup not in ('is', 'near'):
+                store.filter(**{'name__{0}'.format(lookup): ['a'] if lookup == 'in' else 'a'})
+
+    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_models(self, get_subclass_model_mock, request_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'LocalStoreTestObject', [{'name': 'code', 'type': 'string'}, {'name': 'founded', 'type': 'datetime'}]
+        )
+        request_mock.return_value = {'objects': [
+            {'id': 1, 'code': 'PL', 'founded': {'type': 'datetime', 'value': '1918-11-11T00:00:00.000000Z'}},
+            {'id': 2, 'code': 'DE', 'founded': {'type': 'datetime', 'value': '1990-10-03T00:00:00.000000Z'}},
+        ], 'next': None}
+
+        store = Object.please.list(instance_name='test', class_name='test').to_local(hash_indexes=['code'])
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual([obj.id for obj in store.filter(code='DE')], [2])
+        self.assertEqual([obj.id for obj in store.filter(founded__lt=datetime(1950, 1, 1))], [1])
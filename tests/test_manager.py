@@ -2,8 +2,27 @@ import json
 import unittest
 from datetime import datetime
 
-from syncano.exceptions import SyncanoDoesNotExist, SyncanoRequestError, SyncanoValueError
-from syncano.models import Instance, Object, Script, ScriptEndpoint, ScriptEndpointTrace, ScriptTrace, User, registry
+from syncano.connection import Connection
+from syncano.exceptions import (
+    IncrementBufferError,
+    RevisionMismatchException,
+    SyncanoDoesNotExist,
+    SyncanoRequestError,
+    SyncanoValueError
+)
+from syncano.models import (
+    Class,
+    Instance,
+    Object,
+    Script,
+    ScriptEndpoint,
+    ScriptEndpointTrace,
+    ScriptTrace,
+    User,
+    registry
+)
+from syncano.models.manager import SchemaManager, update_url_query
+from syncano.utils import CancellationToken, ConcurrencyGovernor, Deadline
 
 try:
     from unittest import mock
@@ -457,6 +476,30 @@ class ManagerTestCase(unittest.TestCase):
         with self.assertRaises(SyncanoValueError):
             self.manager.request()
 
+    @mock.patch('syncano.models.manager.map_concurrently')
+    @mock.patch('syncano.models.manager.Manager.connection')
+    def test_priority(self, connection_mock, map_mock):
+        self.manager.priority(Connection.PRIORITY_BACKGROUND)._map_concurrently(len, [])
+        map_mock.assert_called_once_with(len, [], workers=None, governor=connection_mock.governor,
+                                         priority=Connection.PRIORITY_BACKGROUND)
+
+        self.manager._map_concurrently(len, [], workers=2)
+        map_mock.assert_called_with(len, [], workers=2, governor=connection_mock.governor,
+                                    priority=Connection.PRIORITY_INTERACTIVE)
+
+    @mock.patch('syncano.models.manager.Manager.connection')
+    def test_timeout(self, connection_mock):
+        token = CancellationToken()
+        deadlines = []
+        connection_mock.request.side_effect = lambda *args, **kwargs: deadlines.append(Deadline.current()) or {}
+
+        self.manager.timeout(5, token=token).request()
+        self.assertLessEqual(deadlines[0].remaining(), 5)
+        self.assertEqual(deadlines[0].tokens, [token])
+
+        self.manager.request()
+        self.assertIsNone(deadlines[1].remaining())
+
     @mock.patch('syncano.models.manager.Manager.request')
     def test_iterator(self, request_mock):
         request_mock.side_effect = [
@@ -480,6 +523,78 @@ class ManagerTestCase(unittest.TestCase):
         self.assertEqual(request_mock.call_count, 2)
         request_mock.assert_called_with(path='next_url')
 
+    @mock.patch('syncano.models.manager.Manager.connection')
+    def test_exists(self, connection_mock):
+        connection_mock.request.return_value = {'objects': [{'name': 'test'}], 'next': None}
+        self.assertTrue(self.manager.list().exists())
+        self.assertTrue(self.manager.list())
+        connection_mock.request.assert_called_with('GET', '/v1.1/instances/', headers={}, params={'page_size': 1})
+
+        connection_mock.request.return_value = {'objects': [], 'next': None}
+        self.assertFalse(self.manager.list().exists())
+
+        with self.assertRaises(TypeError):
+            len(self.manager.list())
+
+    @mock.patch('syncano.models.manager.Manager.SKIP_PAGE_SIZE', 2)
+    @mock.patch('syncano.models.manager.Manager.serialize')
+    @mock.patch('syncano.models.manager.Manager.request')
+    def test_getitem_skips_preceding_pages(self, request_mock, serialize_mock):
+        serialize_mock.side_effect = lambda data: data
+        request_mock.side_effect = [
+            {'objects': [{'name': 'a'}, {'name': 'b'}], 'next': '/v1.1/instances/?page_size=2&last_pk=2'},
+            {'objects': [{'name': 'c'}], 'next': '/v1.1/instances/?page_size=1&last_pk=3'},
+            {'objects': [{'name': 'd'}, {'name': 'e'}], 'next': '/v1.1/instances/?page_size=2&last_pk=5'},
+        ]
+
+        results = self.manager.list()[3:5]
+        self.assertEqual(results, [{'name': 'd'}, {'name': 'e'}])
+        self.assertEqual(serialize_mock.call_count, 2)
+        self.assertEqual(request_mock.call_count, 3)
+        request_mock.assert_any_call(path='/v1.1/instances/?last_pk=2&page_size=1', params={})
+        request_mock.assert_called_with(path='/v1.1/instances/?last_pk=3&page_size=2', params={})
+
+        request_mock.side_effect = [{'objects': [{'name': 'a'}], 'next': None}]
+        with self.assertRaises(IndexError):
+            self.manager.list()[3]
+
+        request_mock.reset_mock()
+        self.assertEqual(self.manager.list().limit(2)[3:], [])
+        self.assertFalse(request_mock.called)
+
+    @mock.patch('syncano.models.manager.time.sleep')
+    @mock.patch('syncano.models.Class.save')
+    @mock.patch('syncano.models.manager.Manager.get')
+    def test_update_with(self, get_mock, save_mock, sleep_mock):
+        get_mock.side_effect = lambda **kwargs: Class(description='a', revision=2, **kwargs)
+        save_mock.side_effect = [RevisionMismatchException(400, {'expected_revision': 'Revision mismatch.'}), 'saved']
+
+        def modify(klass):
+            klass.description += 'b'
+
+        self.assertEqual(Class.please.update_with(modify, instance_name='test', name='test'), 'saved')
+        self.assertEqual(get_mock.call_count, 2)
+        self.assertEqual(sleep_mock.call_count, 1)
+        save_mock.assert_called_with(expected_revision=2)
+
+        save_mock.side_effect = RevisionMismatchException(400, {'expected_revision': 'Revision mismatch.'})
+        with self.assertRaises(RevisionMismatchException):
+            Class.please.update_with(modify, instance_name='test', name='test', retries=1)
+        self.assertEqual(sleep_mock.call_count, 2)
+
+        save_mock.side_effect = lambda **kwargs: 'saved'
+        manager = Class.please.using(Connection(api_key='key'))
+        results = manager.bulk_update_with(modify, ['a', 'b'], instance_name='test')
+        self.assertEqual(results, {'a': 'saved', 'b': 'saved'})
+        get_mock.assert_any_call(instance_name='test', name='a')
+
+        with self.assertRaises(SyncanoValueError):
+            self.manager.update_with(modify, name='test')
+
+    def test_update_url_query(self):
+        url = update_url_query('/v1.1/?page_size=2&last_pk=3&fields=id', page_size=10, fields=None)
+        self.assertEqual(url, '/v1.1/?last_pk=3&page_size=10')
+
     def test_get_allowed_method(self):
         self.manager.endpoint = 'detail'
 
@@ -567,7 +682,7 @@ class ObjectManagerTestCase(unittest.TestCase):
 
     def setUp(self):
         self.model = Object
-        self.manager = Object.please
+        self.manager = Object.please.using(Connection(api_key='key'))
 
     @mock.patch('syncano.models.Object.get_subclass_model')
     def test_create(self, get_subclass_model_mock):
@@ -651,21 +766,332 @@ class ObjectManagerTestCase(unittest.TestCase):
             self.model
         )
 
-    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.manager.Manager.batch')
     @mock.patch('syncano.models.manager.ObjectManager.serialize')
     @mock.patch('syncano.models.manager.Manager.iterator')
-    def test_update_with_filter(self, iterator_mock, serialize_mock, request_mock):
-        iterator_mock.return_value = [Object(class_name='test', instance_name='test')]
+    def test_update_with_filter(self, iterator_mock, serialize_mock, batch_mock):
+        iterator_mock.return_value = [{'id': 20}, {'id': 21}]
         serialize_mock.return_value = serialize_mock
+        batch_mock.side_effect = lambda *args: [arg['body'] for arg in args]
         self.assertFalse(serialize_mock.called)
 
-        self.model.please.list(class_name='test', instance_name='test').filter(id=20).update(channel=1, revision=None)
+        results = self.manager.list(class_name='test', instance_name='test').filter(id__gte=20).update(
+            channel=1, revision=None
+        )
 
         self.assertTrue(serialize_mock.called)
         serialize_mock.assert_called_once_with(
             {'channel': 1, 'revision': None},
             self.model
         )
+        self.assertEqual([result['path'] for result in results], [
+            '/v1.1/instances/test/classes/test/objects/20/',
+            '/v1.1/instances/test/classes/test/objects/21/',
+        ])
+        self.assertEqual(results[0]['method'], 'PATCH')
+
+    @mock.patch('syncano.utils.ConcurrencyGovernor.acquire', autospec=True, side_effect=ConcurrencyGovernor.acquire)
+    @mock.patch('syncano.models.manager.ObjectManager.BULK_PAGE_SIZE', 60)
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_delete_with_filter(self, get_subclass_model_mock, request_mock, batch_mock, acquire_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass('DeleteWithFilterTestObject', [])
+        request_mock.side_effect = [
+            {'objects': [{'id': i} for i in range(1, 61)], 'next': 'next_url'},
+            {'objects': [{'id': i} for i in range(61, 71)], 'next': None},
+        ]
+        batch_mock.side_effect = lambda *args: [{'code': 204} for _ in args]
+
+        results = self.manager.list(class_name='test', instance_name='test').filter(id__gt=0).delete()
+
+        self.assertEqual(results, dict((i, {'code': 204}) for i in range(1, 71)))
+        self.assertEqual(batch_mock.call_count, 3)
+        self.assertEqual(batch_mock.call_args[0][0]['body'], {
+            'method': 'DELETE',
+            'path': '/v1.1/instances/test/classes/test/objects/61/',
+            'body': {},
+        })
+        # bulk work waits for slots of the connection governor behind interactive tasks;
+        self.assertEqual(set(call[0][1] for call in acquire_mock.call_args_list), {Connection.PRIORITY_BACKGROUND})
+
+    @mock.patch('syncano.utils.ConcurrencyGovernor.acquire', autospec=True, side_effect=ConcurrencyGovernor.acquire)
+    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.manager.ObjectManager.serialize')
+    def test_iterate_with_priority(self, serialize_mock, request_mock, acquire_mock):
+        pages = [{'objects': [{'id': 1}], 'next': 'next_url'}, {'objects': [{'id': 2}], 'next': None}]
+        request_mock.side_effect = pages
+        manager = self.manager.list(instance_name='test', class_name='test')
+
+        self.assertEqual(len(list(manager.all())), 2)
+        self.assertFalse(acquire_mock.called)
+
+        request_mock.side_effect = pages
+        self.assertEqual(len(list(manager.priority(Connection.PRIORITY_BACKGROUND))), 2)
+        # each page request of a background scan waits for a slot of the connection governor;
+        self.assertEqual([call[0][1] for call in acquire_mock.call_args_list], [Connection.PRIORITY_BACKGROUND] * 2)
+
+    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.manager.ObjectManager.serialize')
+    def test_len_and_exists(self, serialize_mock, request_mock):
+        request_mock.return_value = {'objects': [{'id': 1}, {'id': 2}], 'next': None, 'objects_count': 2}
+        manager = self.manager.list(instance_name='test', class_name='test').page_size(2)
+
+        self.assertEqual(len(manager), 2)
+        self.assertEqual(len(list(manager)), 2)
+        self.assertEqual(request_mock.call_count, 1)
+        request_mock.assert_called_once_with(params={'page_size': 2, 'include_count': True})
+        self.assertEqual(len(manager.limit(1)), 1)
+
+        request_mock.reset_mock()
+        self.assertEqual(len(list(manager.all())), 2)
+        request_mock.assert_called_once_with()  # list() alone does not ask for the count;
+
+        request_mock.reset_mock()
+        serialize_mock.reset_mock()
+        self.assertTrue(manager.exists())
+        self.assertEqual(request_mock.call_count, 1)
+        self.assertFalse(serialize_mock.called)
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_increment_buffer(self, get_subclass_model_mock, batch_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'IncrementBufferTestObject', [{'name': 'views', 'type': 'integer'}, {'name': 'title', 'type': 'string'}]
+        )
+        batch_mock.side_effect = lambda *args: ['updated' for _ in args]
+
+        counters = self.manager.increment_buffer(instance_name='test', class_name='test')
+        for _ in range(10):
+            counters.increment('views', 2, id=1)
+        counters.decrement('views', 5, id=2)
+        counters.increment('views', 1, id=3)
+        counters.decrement('views', 1, id=3)
+        self.assertEqual(len(counters), 3)
+        self.assertEqual(get_subclass_model_mock.call_count, 1)
+
+        with self.assertRaises(SyncanoValueError):
+            counters.increment('views', -1, id=1)
+
+        with self.assertRaises(SyncanoValueError):
+            counters.increment('title', 1, id=4)
+
+        results = counters.flush()
+        self.assertEqual(len(counters), 0)
+        self.assertEqual(batch_mock.call_count, 1)
+        self.assertEqual(results, ['updated', 'updated'])
+        self.assertEqual([arg['body'] for arg in batch_mock.call_args[0]], [
+            {
+                'method': 'PATCH',
+                'path': '/v1.1/instances/test/classes/test/objects/1/',
+                'body': {'views': {'_increment': 20}},
+            },
+            {
+                'method': 'PATCH',
+                'path': '/v1.1/instances/test/classes/test/objects/2/',
+                'body': {'views': {'_increment': -5}},
+            },
+        ])
+
+    @mock.patch('syncano.utils.ConcurrencyGovernor.acquire', autospec=True, side_effect=ConcurrencyGovernor.acquire)
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_increment_buffer_max_size(self, get_subclass_model_mock, batch_mock, acquire_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'IncrementBufferTestObject', [{'name': 'views', 'type': 'integer'}]
+        )
+        batch_mock.side_effect = lambda *args: ['updated' for _ in args]
+
+        with self.manager.increment_buffer(instance_name='test', class_name='test', max_size=2) as counters:
+            for object_id in range(5):
+                counters.increment('views', 1, id=object_id)
+            self.assertEqual(batch_mock.call_count, 2)
+        self.assertEqual(batch_mock.call_count, 3)
+        self.assertEqual([call[0][1] for call in acquire_mock.call_args_list], [Connection.PRIORITY_BACKGROUND] * 3)
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_increment_buffer_errors(self, get_subclass_model_mock, batch_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'IncrementBufferTestObject', [{'name': 'views', 'type': 'integer'}]
+        )
+        counters = self.manager.increment_buffer(instance_name='test', class_name='test', max_size=2)
+        counters.increment('views', 1, id=1)
+
+        batch_mock.side_effect = SyncanoRequestError(500, 'Server error.')
+        with self.assertRaises(SyncanoRequestError):
+            counters.increment('views', 2, id=2)
+        self.assertEqual(len(counters), 2)  # put back for the next flush;
+
+        batch_mock.side_effect = lambda *args: [{'code': 404, 'content': {'detail': 'Not found.'}}, 'updated']
+        with self.assertRaises(IncrementBufferError) as context:
+            counters.increment('views', 1, id=1)
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(context.exception.errors[0][:2], ({'instance_name': 'test', 'class_name': 'test', 'id': 1},
+                                                           {'views': 2}))
+        self.assertEqual(len(counters), 0)
+
+        batch_mock.side_effect = lambda *args: ['updated' for _ in args]
+        with self.assertRaises(ValueError):
+            with counters:
+                counters.increment('views', 1, id=3)
+                raise ValueError
+        self.assertEqual(len(counters), 0)
+        self.assertEqual(batch_mock.call_args[0][0]['body']['path'], '/v1.1/instances/test/classes/test/objects/3/')
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_bulk_relate(self, get_subclass_model_mock, batch_mock):
+        model = Object.create_subclass(
+            'BulkRelateTestObject', [{'name': 'followers', 'type': 'relation'}, {'name': 'title', 'type': 'string'}]
+        )
+        get_subclass_model_mock.return_value = model
+        batch_mock.side_effect = lambda *args: [arg['body'] for arg in args]
+
+        results = self.manager.bulk_relate(
+            'followers',
+            {1: [10, 11], 2: model(id=10), 3: []},
+            instance_name='test',
+            class_name='test'
+        )
+        self.assertEqual(results, {
+            1: {
+                'method': 'PATCH',
+                'path': '/v1.1/instances/test/classes/test/objects/1/',
+                'body': {'followers': {'_add': [10, 11]}},
+            },
+            2: {
+                'method': 'PATCH',
+                'path': '/v1.1/instances/test/classes/test/objects/2/',
+                'body': {'followers': {'_add': [10]}},
+            },
+        })
+
+        results = self.manager.bulk_unrelate(
+            'followers', dict((i, [1]) for i in range(120)), instance_name='test', class_name='test'
+        )
+        self.assertEqual(len(results), 120)
+        self.assertEqual(results[5]['body'], {'followers': {'_remove': [1]}})
+        self.assertEqual(batch_mock.call_count, 4)
+
+        with self.assertRaises(SyncanoValueError):
+            self.manager.bulk_relate('title', {1: [2]}, instance_name='test', class_name='test')
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_bulk_upsert(self, get_subclass_model_mock, request_mock, batch_mock):
+        model = Object.create_subclass('BulkUpsertTestObject', [
+            {'name': 'external_id', 'type': 'string', 'filter_index': True},
+            {'name': 'title', 'type': 'string'},
+        ])
+        get_subclass_model_mock.return_value = model
+        request_mock.return_value = {'objects': [{'id': 7, 'external_id': 'b'}], 'next': None}
+        batch_mock.side_effect = lambda *args: [arg['body'] for arg in args]
+
+        results = self.manager.bulk_upsert(
+            [{'external_id': 'a', 'title': 'one'}, {'external_id': 'b', 'title': 'two'}],
+            instance_name='test',
+            class_name='test'
+        )
+
+        self.assertEqual(request_mock.call_count, 1)
+        self.assertEqual(batch_mock.call_count, 1)
+        self.assertEqual(results[0][0]['method'], 'POST')
+        self.assertEqual(results[0][0]['path'], '/v1.1/instances/test/classes/test/objects/')
+        self.assertEqual(results[0][0]['body']['title'], 'one')
+        self.assertTrue(results[0][1])
+        self.assertEqual(results[1][0], {
+            'method': 'PATCH',
+            'path': '/v1.1/instances/test/classes/test/objects/7/',
+            'body': {'external_id': 'b', 'title': 'two'},
+        })
+        self.assertFalse(results[1][1])
+
+        with self.assertRaises(SyncanoValueError):
+            self.manager.bulk_upsert([{'external_id': 'a'}] * 2, instance_name='test', class_name='test')
+
+        with self.assertRaises(SyncanoValueError):
+            self.manager.bulk_upsert([{'title': 'a'}], instance_name='test', class_name='test')
+
+    @mock.patch('syncano.models.manager.ObjectManager.MAX_QUERY_LENGTH', 100)
+    @mock.patch('syncano.models.manager.ObjectManager.request', autospec=True)
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_split_in_filter(self, get_subclass_model_mock, request_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'SplitInFilterTestObject', [{'name': 'title', 'type': 'string', 'order_index': True}]
+        )
+
+        def request(manager, **kwargs):
+            ids = json.loads(manager.query['query'])['id']['_in']
+            self.assertLessEqual(len(manager.query['query']), 100)
+            if 'page_size' in manager.query and not manager.query['page_size']:
+                return {'objects': [], 'objects_count': len(ids)}
+            objects = [{'id': i, 'title': str(i % 7)} for i in sorted(ids)]
+            if manager.query.get('order_by') == '-title':
+                objects.sort(key=lambda obj: obj['title'], reverse=True)
+            return {'objects': objects, 'next': None}
+
+        request_mock.side_effect = request
+        manager = self.manager.list(instance_name='test', class_name='test').filter(id__in=list(range(40, 0, -1)))
+
+        objects = list(manager)
+        self.assertGreater(request_mock.call_count, 1)
+        self.assertEqual([obj.id for obj in objects], list(range(1, 41)))
+
+        objects = list(manager.order_by('-title').limit(3))
+        self.assertEqual([obj.title for obj in objects], ['6', '6', '6'])
+        self.assertEqual(manager[5:7][0].id, 6)
+        self.assertEqual(manager.count(), 40)
+
+        manager = self.manager.list(instance_name='test', class_name='test')
+        self.assertIsNone(manager.filter(title__startswith='x' * 200)._split_queries)
+        self.assertIsNone(manager.filter(title__in=['x' * 200, 'y'])._split_queries)
+
+    @mock.patch('syncano.models.manager.Manager.in_bulk')
+    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.Object.get_class_schema')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_prefetch_related(self, get_subclass_model_mock, get_class_schema_mock, request_mock, in_bulk_mock):
+        schema = [
+            {'name': 'author', 'type': 'reference', 'target': 'authors'},
+            {'name': 'tags', 'type': 'relation', 'target': 'tags'},
+            {'name': 'title', 'type': 'string'},
+        ]
+        model = Object.create_subclass('PrefetchTestObject', schema)
+        get_subclass_model_mock.return_value = model
+        get_class_schema_mock.return_value = SchemaManager(schema)
+        request_mock.return_value = {
+            'objects': [
+                {'id': 1, 'author': 10, 'tags': [20, 21]},
+                {'id': 2, 'author': 10, 'tags': [21, 22]},
+                {'id': 3},
+            ],
+            'next': None,
+            'objects_count': 3,
+        }
+        related = {i: model(id=i) for i in (10, 20, 21)}
+        in_bulk_mock.side_effect = lambda ids: {i: related.get(i, {'code': 404}) for i in ids}
+
+        objects = list(
+            self.manager.list(instance_name='test', class_name='test').prefetch_related('author', 'tags')
+        )
+
+        self.assertEqual(request_mock.call_count, 1)
+        self.assertEqual(in_bulk_mock.call_count, 2)
+        in_bulk_mock.assert_any_call([10])
+        in_bulk_mock.assert_any_call([20, 21, 22])
+        self.assertIs(objects[0].get_prefetched('author'), related[10])
+        self.assertIs(objects[1].get_prefetched('author'), related[10])
+        self.assertEqual(objects[1].get_prefetched('tags'), [related[21]])
+        self.assertIsNone(objects[2].get_prefetched('author'))
+        self.assertEqual(objects[2].get_prefetched('tags'), [])
+
+        with self.assertRaises(SyncanoValueError):
+            objects[0].get_prefetched('title')
+
+        with self.assertRaises(SyncanoValueError):
+            list(self.manager.list(instance_name='test', class_name='test').prefetch_related('title'))
 
 
 # TODO
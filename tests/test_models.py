@@ -1,7 +1,8 @@
+import json
 import unittest
 
-from syncano.exceptions import SyncanoValidationError
-from syncano.models import Instance, registry
+from syncano.exceptions import SyncanoValidationError, SyncanoValueError
+from syncano.models import Class, Instance, registry
 
 try:
     from unittest import mock
@@ -197,3 +198,95 @@ class ModelTestCase(unittest.TestCase):
             '/v1.1/instances/',
             data={'name': 'test', 'expected_revision': 12}
         )
+
+
+class DirtyFieldsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Class(instance_name='test', name='test', description='desc', links={'self': 'dummy'})
+        self.model.mark_clean()
+
+    def test_tracking(self):
+        self.assertIsNone(Class(instance_name='test', name='test').get_dirty_fields())
+        self.assertEqual(self.model.get_dirty_fields(), set())
+
+        self.model.description = 'new desc'
+        self.model.metadata = {'a': 1}
+        self.assertEqual(self.model.get_dirty_fields(), {'description', 'metadata'})
+
+        self.model.mark_clean(['metadata'])
+        self.assertEqual(self.model.get_dirty_fields(), {'description'})
+
+    @mock.patch('syncano.models.Class._get_connection')
+    def test_save_dirty_fields(self, connection_mock):
+        connection_mock.return_value = connection_mock
+        connection_mock.request.return_value = {'description': 'new desc'}
+
+        self.model.description = 'new desc'
+        self.model.save()
+
+        connection_mock.request.assert_called_once_with(
+            'PATCH',
+            '/v1.1/instances/test/classes/test/',
+            data={'description': 'new desc'}
+        )
+        self.assertEqual(self.model.get_dirty_fields(), set())
+
+    @mock.patch('syncano.models.Class._get_connection')
+    def test_save_in_place_changes(self, connection_mock):
+        connection_mock.return_value = connection_mock
+        connection_mock.request.return_value = {}
+        model = Class(instance_name='test', name='test', schema=[{'name': 'title', 'type': 'string'}],
+                      metadata={'tags': ['a']}, links={'self': 'dummy'})
+        model.mark_clean()
+        self.assertEqual(model.get_dirty_fields(), set())
+        self.assertEqual(model._clean_values, {})  # nothing is copied until a value is read;
+
+        model.schema.add({'name': 'pages', 'type': 'integer'})
+        model.metadata['tags'].append('b')
+        model.description = 'new desc'
+        self.assertEqual(model.get_dirty_fields(), {'schema', 'metadata', 'description'})
+        model.save()
+
+        data = connection_mock.request.call_args[1]['data']
+        self.assertEqual(set(data), {'schema', 'metadata', 'description'})
+        self.assertEqual(json.loads(data['metadata']), {'tags': ['a', 'b']})
+        self.assertEqual(len(json.loads(data['schema'])), 2)
+        self.assertEqual(model.get_dirty_fields(), set())
+
+    @mock.patch('syncano.models.Class._get_connection')
+    def test_save_update_fields(self, connection_mock):
+        connection_mock.return_value = connection_mock
+        connection_mock.request.return_value = {}
+
+        self.model.description = None
+        self.model.save(update_fields=['description'], expected_revision=2)
+        connection_mock.request.assert_called_with(
+            'PATCH',
+            '/v1.1/instances/test/classes/test/',
+            data={'description': None, 'expected_revision': 2}
+        )
+
+        with self.assertRaises(SyncanoValueError):
+            self.model.save(update_fields=['dummy'])
+
+        with self.assertRaises(SyncanoValidationError):
+            Class(instance_name='test', name='test').save(update_fields=['description'])
+
+    @mock.patch('syncano.models.Class.validate')
+    @mock.patch('syncano.models.Class._get_connection')
+    def test_save_validates_dirty_fields(self, connection_mock, validate_mock):
+        connection_mock.return_value = connection_mock
+        connection_mock.request.return_value = {}
+
+        self.model.description = 'new desc'
+        self.model.save()
+        validate_mock.assert_called_once_with(field_names={'description'})
+
+    @mock.patch('syncano.models.Class._get_connection')
+    def test_save_without_changes(self, connection_mock):
+        connection_mock.return_value = connection_mock
+        connection_mock.request.return_value = {}
+
+        self.model.save()
+        connection_mock.request.assert_called_once_with('PATCH', '/v1.1/instances/test/classes/test/', data={})
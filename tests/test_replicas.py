@@ -0,0 +1,83 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from syncano.connection import Connection
+from syncano.models import Object
+from syncano.models.replicas import ObjectReplica
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class ObjectReplicaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = Object.please.using(Connection(api_key='key')).list(instance_name='test', class_name='books')
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'replica.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def select(self, sql):
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(sql).fetchall()
+        finally:
+            connection.close()
+
+    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.Object.get_class_schema')
+    def test_sync(self, get_class_schema_mock, request_mock):
+        get_class_schema_mock.return_value = [
+            {'name': 'title', 'type': 'string', 'filter_index': True},
+            {'name': 'pages', 'type': 'integer'},
+            {'name': 'tags', 'type': 'array'},
+            {'name': 'author', 'type': 'reference', 'target': 'authors'},
+        ]
+        request_mock.side_effect = [
+            {'objects': [
+                {'id': 1, 'title': 'one', 'pages': 10, 'tags': ['a'], 'updated_at': '2016-01-02T00:00:00.000000Z',
+                 'author': {'type': 'reference', 'target': 'authors', 'value': 5}},
+            ], 'next': 'next_url'},
+            {'objects': [{'id': 2, 'title': 'two', 'updated_at': '2016-01-01T00:00:00.000000Z'}], 'next': None},
+        ]
+
+        self.assertEqual(self.manager.replicate_to(self.path), 2)
+        self.assertEqual(self.select('SELECT id, title, pages, tags, author FROM books ORDER BY id'), [
+            (1, 'one', 10, '["a"]', 5),
+            (2, 'two', None, None, None),
+        ])
+        indexes = [row[1] for row in self.select("SELECT type, name FROM sqlite_master WHERE type = 'index'")]
+        self.assertIn('books_title_idx', indexes)
+        self.assertNotIn('books_pages_idx', indexes)
+
+        request_mock.reset_mock()
+        request_mock.side_effect = [
+            {'objects': [{'id': 2, 'title': 'changed', 'updated_at': '2016-01-03T00:00:00.000000Z'}], 'next': None},
+        ]
+        get_manager = ObjectReplica.get_manager
+        with mock.patch('syncano.models.replicas.ObjectReplica.get_manager', autospec=True) as get_manager_mock:
+            get_manager_mock.side_effect = get_manager
+            self.assertEqual(self.manager.replicate_to(self.path), 1)
+            self.assertEqual(get_manager_mock.call_args[0][1], '2016-01-02T00:00:00.000000Z')
+
+        self.assertEqual(self.select('SELECT title FROM books ORDER BY id'), [('one',), ('changed',)])
+        self.assertEqual(self.select('SELECT watermark FROM syncano_replicas'), [('2016-01-03T00:00:00.000000Z',)])
+
+    def test_get_manager(self):
+        manager = self.manager._clone()
+        manager.query['query'] = json.dumps({'pages': {'_gt': 10}})
+        manager = ObjectReplica(manager, self.path).get_manager('2016-01-02T00:00:00.000000Z')
+        self.assertEqual(json.loads(manager.query['query']), {
+            'pages': {'_gt': 10},
+            'updated_at': {'_gte': '2016-01-02T00:00:00.000000Z'},
+        })
+        self.assertEqual(manager.query['order_by'], 'updated_at')
+        self.assertFalse(manager._serialize)
@@ -0,0 +1,150 @@
+import unittest
+
+from syncano.exceptions import UnitOfWorkError
+from syncano.models import Class, registry
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class SessionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = Class.please
+
+    def test_no_session(self):
+        self.assertIsNone(registry.identity_map)
+        instance = Class(instance_name='test', name='test')
+        self.assertIs(registry.resolve_identity(instance), instance)
+
+    def test_session_nesting(self):
+        with registry.session() as identity_map:
+            self.assertIs(registry.identity_map, identity_map)
+            with registry.session() as nested_map:
+                self.assertIs(nested_map, identity_map)
+            self.assertIs(registry.identity_map, identity_map)
+        self.assertIsNone(registry.identity_map)
+
+    def test_resolve_identity(self):
+        with registry.session() as identity_map:
+            first = registry.resolve_identity(Class(instance_name='test', name='test', description='old'))
+            second = registry.resolve_identity(Class(instance_name='test', name='test', description='new'))
+            other = registry.resolve_identity(Class(instance_name='test', name='other'))
+            new = registry.resolve_identity(Class(instance_name='test'))
+
+            self.assertIs(first, second)
+            self.assertIsNot(first, other)
+            self.assertEqual(first.description, 'new')
+            self.assertEqual(len(identity_map), 2)
+            self.assertNotIn(new, identity_map)
+            self.assertEqual(registry.resolve_identity({'a': 1}), {'a': 1})
+
+    def test_resolve_keeps_local_changes(self):
+        with registry.session():
+            first = registry.resolve_identity(Class(instance_name='test', name='test', description='old'))
+            first.mark_clean()
+            first.description = 'local'
+
+            fresh = Class(instance_name='test', name='test', description='server', metadata={'a': 1})
+            self.assertIs(registry.resolve_identity(fresh), first)
+
+        self.assertEqual(first.description, 'local')
+        self.assertEqual(first.metadata, {'a': 1})
+        self.assertEqual(first.get_dirty_fields(), {'description'})
+
+    @mock.patch('syncano.models.manager.Manager.connection')
+    def test_manager_queries(self, connection_mock):
+        connection_mock.request.side_effect = [
+            {'name': 'test', 'description': 'one'},
+            {'objects': [{'name': 'test', 'description': 'two'}], 'next': None},
+            [{'code': 200, 'content': {'name': 'test', 'description': 'three'}}],
+        ]
+
+        with registry.session():
+            detail = self.manager.get(instance_name='test', name='test')
+            listed = list(self.manager.list(instance_name='test'))[0]
+            bulk = self.manager.in_bulk(['test'], instance_name='test')['test']
+
+        self.assertIs(detail, listed)
+        self.assertIs(detail, bulk)
+        self.assertEqual(detail.description, 'three')
+
+    @mock.patch('syncano.models.Class._get_connection')
+    def test_delete(self, connection_mock):
+        connection_mock.return_value = connection_mock
+        with registry.session() as identity_map:
+            instance = registry.resolve_identity(Class(instance_name='test', name='test', links={'self': 'dummy'}))
+            self.assertIn(instance, identity_map)
+            instance.delete()
+            self.assertEqual(len(identity_map), 0)
+
+
+class UnitOfWorkTestCase(unittest.TestCase):
+
+    def get_model(self, name, **kwargs):
+        return Class(instance_name='test', name=name, links={'self': 'dummy'}, **kwargs)
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Class._get_connection')
+    def test_queue_and_flush(self, connection_mock, batch_mock):
+        connection_mock.return_value = connection_mock
+        first = self.get_model('first')
+        second = self.get_model('second')
+        batch_mock.return_value = [
+            Class(instance_name='test', name='first', description='saved'),
+            {'code': 204},
+        ]
+
+        with registry.unit_of_work() as unit_of_work:
+            first.save()
+            first.description = 'changed'
+            first.save()
+            second.delete()
+            self.assertEqual(len(unit_of_work), 2)
+            self.assertFalse(connection_mock.request.called)
+            self.assertFalse(batch_mock.called)
+
+        self.assertIsNone(registry.pending_unit_of_work)
+        self.assertFalse(connection_mock.request.called)
+        self.assertEqual(batch_mock.call_count, 1)
+
+        requests = [arg['body'] for arg in batch_mock.call_args[0]]
+        self.assertEqual(requests[0]['method'], 'PUT')
+        self.assertEqual(requests[0]['body']['description'], 'changed')
+        self.assertEqual(requests[1], {'method': 'DELETE', 'path': '/v1.1/instances/test/classes/second/', 'body': {}})
+
+        self.assertEqual(first.description, 'saved')
+        self.assertEqual(first.get_dirty_fields(), set())
+        self.assertIsNone(second.name)
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    def test_max_size(self, batch_mock):
+        batch_mock.side_effect = lambda *args: [{'code': 204} for _ in args]
+
+        with registry.unit_of_work(max_size=2):
+            for i in range(5):
+                self.get_model('model_{}'.format(i)).delete()
+            self.assertEqual(batch_mock.call_count, 2)
+
+        self.assertEqual(batch_mock.call_count, 3)
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    def test_errors(self, batch_mock):
+        batch_mock.return_value = [{'code': 404, 'content': {'detail': 'Not found.'}}]
+        model = self.get_model('test')
+
+        with self.assertRaises(UnitOfWorkError) as context:
+            with registry.unit_of_work():
+                model.delete()
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(context.exception.errors[0][0], model)
+
+        batch_mock.reset_mock()
+        with self.assertRaises(ValueError):
+            with registry.unit_of_work():
+                model.delete()
+                raise ValueError
+        self.assertFalse(batch_mock.called)
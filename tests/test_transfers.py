@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import six
+from syncano.connection import Connection
+from syncano.exceptions import SyncanoDeadlineExceeded, SyncanoRequestError, SyncanoValueError
+from syncano.models import Object
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class ObjectExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = Object.please.using(Connection(api_key='key')).list(instance_name='test', class_name='test')
+        self.pages = [
+            {'objects': [{'id': 1, 'title': 'one', 'tags': ['a']}, {'id': 2, 'title': None}], 'next': 'next_url'},
+            {'objects': [{'id': 3, 'title': 'three'}], 'next': None},
+        ]
+
+    @mock.patch('syncano.models.manager.Manager.request')
+    @mock.patch('syncano.models.manager.ObjectManager.serialize')
+    def test_ndjson(self, serialize_mock, request_mock):
+        request_mock.side_effect = self.pages
+        progress_mock = mock.Mock()
+        output = six.StringIO()
+
+        count = self.manager.export(output, progress=progress_mock)
+
+        self.assertEqual(count, 3)
+        self.assertFalse(serialize_mock.called)
+        request_mock.assert_called_with(path='next_url')
+        self.assertEqual([json.loads(line) for line in output.getvalue().splitlines()], [
+            {'id': 1, 'title': 'one', 'tags': ['a']},
+            {'id': 2, 'title': None},
+            {'id': 3, 'title': 'three'},
+        ])
+        self.assertEqual(progress_mock.call_count, 2)
+        self.assertEqual(progress_mock.call_args[0][0], 3)
+
+    @mock.patch('syncano.models.manager.ObjectManager._get_model_field_names')
+    @mock.patch('syncano.models.manager.Manager.request')
+    def test_csv(self, request_mock, field_names_mock):
+        request_mock.side_effect = self.pages
+        field_names_mock.return_value = ['id', 'title', 'tags']
+        output = six.StringIO()
+
+        count = self.manager.export(output, format='csv', fields=['id', 'tags'], prefetch=False)
+
+        self.assertEqual(count, 3)
+        self.assertEqual(output.getvalue().splitlines(), ['id,tags', '1,"[""a""]"', '2,', '3,'])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(SyncanoValueError):
+            self.manager.export(six.StringIO(), format='xml')
+
+
+class ObjectImportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = Object.please.using(Connection(api_key='key')).list(instance_name='test', class_name='test')
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'books.ndjson')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as output:
+            output.write('\n'.join(lines) + '\n')
+        return path
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_import_with_checkpoint(self, get_subclass_model_mock, batch_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'ImportTestObject', [{'name': 'title', 'type': 'string'}, {'name': 'pages', 'type': 'integer'}]
+        )
+        batch_mock.side_effect = lambda *args: [
+            {'code': 400, 'content': {'title': 'Invalid.'}} if arg['body']['body']['title'] == 'bad' else 'created'
+            for arg in args
+        ]
+        path = self.write('books.ndjson', [json.dumps({'title': str(i), 'pages': i}) for i in range(4)] + [
+            json.dumps({'title': 'bad'}),
+            json.dumps({'title': 'x', 'pages': 'many'}),
+            '',
+            json.dumps({'title': 'last'}),
+        ])
+
+        summary = self.manager.import_file(path, chunk=2, workers=2)
+
+        self.assertEqual(summary, {'created': 5, 'rejected': 2, 'skipped': 0})
+        self.assertEqual(batch_mock.call_count, 3)
+        with open(path + '.rejects') as rejects:
+            rejected = [json.loads(line) for line in rejects]
+        self.assertEqual([row['offset'] for row in rejected], [4, 5])
+        self.assertEqual(rejected[0]['error'], {'code': 400, 'content': {'title': 'Invalid.'}})
+        with open(path + '.checkpoint') as checkpoint:
+            self.assertEqual(json.load(checkpoint), {'offset': 7})
+
+        batch_mock.reset_mock()
+        summary = self.manager.import_file(path)
+        self.assertEqual(summary, {'created': 0, 'rejected': 0, 'skipped': 7})
+        self.assertFalse(batch_mock.called)
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_import_malformed_lines(self, get_subclass_model_mock, batch_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'ImportMalformedTestObject', [{'name': 'title', 'type': 'string'}]
+        )
+        batch_mock.side_effect = lambda *args: ['created' for _ in args]
+        path = self.write('books.ndjson', [
+            json.dumps({'title': 'one'}),
+            '{"title": ',
+            '[1]',
+            json.dumps({'title': 'two'}),
+        ])
+
+        summary = self.manager.import_file(path)
+
+        self.assertEqual(summary, {'created': 2, 'rejected': 2, 'skipped': 0})
+        with open(path + '.rejects') as rejects:
+            rejected = [json.loads(line) for line in rejects]
+        self.assertEqual([(row['offset'], row['record']) for row in rejected], [(1, '{"title": '), (2, [1])])
+        with open(path + '.checkpoint') as checkpoint:
+            self.assertEqual(json.load(checkpoint), {'offset': 4})
+
+        path = self.write('books.csv', ['title', 'one', 'two,extra', 'three'])
+        summary = self.manager.import_file(path, format='csv')
+        self.assertEqual(summary, {'created': 2, 'rejected': 1, 'skipped': 0})
+        with open(path + '.rejects') as rejects:
+            self.assertEqual(json.loads(rejects.readline())['offset'], 1)
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_import_failed_batch(self, get_subclass_model_mock, batch_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'ImportFailedBatchTestObject', [{'name': 'title', 'type': 'string'}]
+        )
+
+        def batch(*args):
+            titles = [arg['body']['body']['title'] for arg in args]
+            if 't1' in titles:
+                raise SyncanoRequestError(503, 'Service unavailable.')
+            if 't5' in titles:
+                raise SyncanoDeadlineExceeded('Deadline exceeded.')
+            return ['created' for _ in args]
+
+        batch_mock.side_effect = batch
+        path = self.write('books.ndjson', [json.dumps({'title': 't{0}'.format(i)}) for i in range(8)])
+
+        with self.assertRaises(SyncanoDeadlineExceeded):
+            self.manager.import_file(path, chunk=1, workers=4)
+
+        with open(path + '.rejects') as rejects:
+            self.assertEqual([json.loads(line)['offset'] for line in rejects], [1, 5])
+        with open(path + '.checkpoint') as checkpoint:
+            self.assertEqual(json.load(checkpoint), {'offset': 8})  # the sent chunks are not sent again;
+        self.assertEqual(batch_mock.call_count, 8)
+
+    @mock.patch('syncano.models.manager.Manager.batch')
+    @mock.patch('syncano.models.Object.get_subclass_model')
+    def test_import_csv(self, get_subclass_model_mock, batch_mock):
+        get_subclass_model_mock.return_value = Object.create_subclass(
+            'ImportCsvTestObject', [{'name': 'title', 'type': 'string'}, {'name': 'pages', 'type': 'integer'}]
+        )
+        batch_mock.side_effect = lambda *args: ['created' for _ in args]
+        path = self.write('books.csv', ['title,pages', 'one,10', 'two,'])
+
+        summary = self.manager.import_file(path, format='csv', checkpoint=os.path.join(self.directory, 'state'))
+
+        self.assertEqual(summary, {'created': 2, 'rejected': 0, 'skipped': 0})
+        bodies = [arg['body']['body'] for arg in batch_mock.call_args[0]]
+        self.assertEqual(bodies[0], {'title': 'one', 'pages': 10})
+        self.assertEqual(bodies[1], {'title': 'two'})
+
+        with self.assertRaises(SyncanoValueError):
+            self.manager.import_file(path, chunk=51)